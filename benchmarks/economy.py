@@ -0,0 +1,238 @@
+'''headless farm seasons played by scripted strategies over a grid of prices and grow speeds, on a process pool'''
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import numpy as np
+import pygame
+from src import settings
+from src.settings import TILE_SIZE, PLAYER_TOOL_OFFSET
+from src.headless import init_display, HeadlessRunner
+from src.inputs import ScriptedKeys
+from src.soil_grid import FARMABLE
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# the settings a grid may change, each a dict keyed by crop or item
+TUNABLE: List[str] = ['GROW_SPEED', 'SALE_PRICES', 'PURCHASE_PRICES']
+
+# seeds planted (None for the best margin under the prices being tried) and trees hit every day
+STRATEGIES: Dict[str, dict] = {
+    'corn': {'seeds': ['corn'], 'chop': 0},
+    'tomato': {'seeds': ['tomato'], 'chop': 0},
+    'mixed': {'seeds': ['corn', 'tomato'], 'chop': 0},
+    'margin': {'seeds': None, 'chop': 0},
+    'lumber': {'seeds': [], 'chop': 4},
+    'farm_and_chop': {'seeds': ['corn', 'tomato'], 'chop': 2}
+}
+
+@contextmanager
+def economy(params: Dict[str, Dict[str, float]]) -> Iterator[None]:
+    '''the settings changed in place for a while, so every module that imported them sees the change'''
+    saved: Dict[str, dict] = {name: dict(getattr(settings, name)) for name in params}
+    try:
+        for name, values in params.items():
+            getattr(settings, name).update(values)
+        yield
+    finally:
+        for name, values in saved.items():
+            getattr(settings, name).update(values)
+
+class Farmer:
+    '''one season of a strategy, played through the level's own soil, tree and shop code'''
+    def __init__(self, strategy: str, field: int, seed: int) -> None:
+        self.runner: HeadlessRunner = HeadlessRunner(ScriptedKeys([]), seed=seed)
+        self.level = self.runner.level
+        self.player = self.level.player
+        # the whole map stays loaded, the farmer walks anywhere in no time
+        self.level.world.load_all()
+        self.strategy: dict = STRATEGIES[strategy]
+        self.field: List[Tuple[int, int]] = self.level.soil_layer.grid.where(FARMABLE)[:field]
+
+    def seeds(self) -> List[str]:
+        '''the seeds this strategy plants under the current prices'''
+        if self.strategy['seeds'] is not None:
+            return self.strategy['seeds']
+        margin = lambda seed: (settings.SALE_PRICES[seed] - settings.PURCHASE_PRICES[seed]) * settings.GROW_SPEED[seed]
+        return [max(self.player.seeds, key=margin)]
+
+    def use(self, tool: str, target: Tuple[float, float]) -> None:
+        '''standing so that a tool reaches a world position and using it'''
+        self.player.status = 'down_idle'
+        center: pygame.math.Vector2 = pygame.math.Vector2(target) - PLAYER_TOOL_OFFSET['down']
+        self.player.rect.center = (round(center.x), round(center.y))
+        self.player.hitbox.center = self.player.rect.center
+        self.player.selected_tool = tool
+        self.player.use_tool()
+
+    def harvest(self) -> None:
+        '''walking over every ripe plant'''
+        for plant in [plant for plant in self.level.soil_layer.plants.values() if plant.harvestable]:
+            self.player.hitbox.center = plant.rect.center
+            self.level.plant_collision()
+
+    def trade(self, seeds: List[str]) -> None:
+        '''selling everything, then buying a seed for every empty cell of the field'''
+        menu = self.level.menu
+        for item in self.player.item_inventory:
+            while menu.sell(item):
+                pass
+        if not seeds:
+            return
+        empty: int = sum(cell not in self.level.soil_layer.plants for cell in self.field)
+        for index in range(max(0, empty - sum(self.player.seed_inventory[seed] for seed in seeds))):
+            if not menu.buy(seeds[index % len(seeds)]):
+                break
+
+    def work(self, seeds: List[str]) -> None:
+        '''tilling, planting and watering the field, then hitting trees'''
+        soil_layer = self.level.soil_layer
+        for index, (x, y) in enumerate(self.field if seeds else []):
+            center: Tuple[float, float] = ((x + 0.5) * TILE_SIZE, (y + 0.5) * TILE_SIZE)
+            self.use('hoe', center)
+            stocked: List[str] = [seed for seed in seeds if self.player.seed_inventory[seed] > 0]
+            if (x, y) not in soil_layer.plants and stocked:
+                self.player.selected_seed = stocked[index % len(stocked)]
+                self.player.use_seed()
+            self.use('water', center)
+        standing = [tree for tree in self.level.tree_sprites.sprites() if tree.is_alive]
+        for tree in standing[:self.strategy['chop']]:
+            self.use('axe', tree.rect.center)
+
+    def evening(self) -> None:
+        '''a frame's update an hour later, felled trees turn to stumps and particles fade'''
+        self.level.scheduler.advance(3600)
+        self.level.all_sprites.update(0)
+
+    def record(self) -> Dict[str, object]:
+        '''money and inventories at the end of a day'''
+        return {'money': self.player.money, 'items': dict(self.player.item_inventory),
+                'seeds': dict(self.player.seed_inventory)}
+
+    def play(self, days: int) -> List[Dict[str, object]]:
+        '''a season of days, each ending with a night's sleep'''
+        curve: List[Dict[str, object]] = []
+        for _ in range(days):
+            seeds: List[str] = self.seeds()
+            self.harvest()
+            self.trade(seeds)
+            self.work(seeds)
+            self.evening()
+            curve.append(self.record())
+            self.level.reset()
+        return curve
+
+def simulate(job: dict) -> dict:
+    '''one season of one strategy under one set of settings'''
+    with economy(job['params']):
+        curve: List[Dict[str, object]] = Farmer(job['strategy'], job['field'], job['seed']).play(job['days'])
+    return dict(job, curve=curve)
+
+def expand(grid: Dict[str, Dict[str, List[float]]]) -> List[Dict[str, Dict[str, float]]]:
+    '''every combination of the values in a grid'''
+    axes: List[Tuple[str, str, List[float]]] = [(name, key, values) for name, keys in grid.items()
+                                                for key, values in keys.items()]
+    combos: List[Dict[str, Dict[str, float]]] = []
+    for choice in itertools.product(*(values for _, _, values in axes)):
+        params: Dict[str, Dict[str, float]] = {}
+        for (name, key, _), value in zip(axes, choice):
+            params.setdefault(name, {})[key] = value
+        combos.append(params)
+    return combos
+
+def check_grid(grid: dict) -> Optional[str]:
+    '''what is wrong with a grid, if anything'''
+    for name, keys in grid.items():
+        if name not in TUNABLE:
+            return f'{name} is not one of {", ".join(TUNABLE)}'
+        for key, values in keys.items():
+            if key not in getattr(settings, name):
+                return f'{name} has no {key}'
+            if not isinstance(values, list) or not values:
+                return f'{name}.{key} needs a list of values'
+    return None
+
+def aggregate(runs: List[dict]) -> List[dict]:
+    '''money and inventory curves over the seeds of every settings and strategy'''
+    groups: Dict[Tuple[str, str], List[dict]] = {}
+    for run in runs:
+        groups.setdefault((json.dumps(run['params'], sort_keys=True), run['strategy']), []).append(run)
+    results: List[dict] = []
+    for (params, strategy), group in groups.items():
+        money: np.ndarray = np.array([[day['money'] for day in run['curve']] for run in group], np.float64)
+        inventories: Dict[str, Dict[str, List[float]]] = {}
+        for section in ('items', 'seeds'):
+            names: List[str] = list(group[0]['curve'][0][section])
+            inventories[section] = {name: np.mean([[day[section][name] for day in run['curve']] for run in group],
+                                                  axis=0).round(3).tolist() for name in names}
+        results.append({
+            'params': json.loads(params),
+            'strategy': strategy,
+            'seeds': [run['seed'] for run in group],
+            'money': {
+                'mean': money.mean(axis=0).round(3).tolist(),
+                'min': money.min(axis=0).tolist(),
+                'max': money.max(axis=0).tolist(),
+                'final': money[:, -1].tolist()
+            },
+            **inventories
+        })
+    results.sort(key=lambda result: -np.mean(result['money']['final']))
+    return results
+
+def init_worker() -> None:
+    '''a dummy display in every worker process'''
+    init_display()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    '''playing every strategy under every settings in the grid for every seed'''
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--grid', help='json file of {"SALE_PRICES": {"corn": [8, 10, 12]}, ...}, '
+                                       'the shipped settings when missing')
+    parser.add_argument('--strategies', nargs='+', choices=list(STRATEGIES), default=list(STRATEGIES))
+    parser.add_argument('--seeds', type=int, default=8, help='seasons played for every settings and strategy')
+    parser.add_argument('--days', type=int, default=28, help='days in a season')
+    parser.add_argument('--field', type=int, default=40, help='farmable tiles worked every day')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='processes, 1 plays in this one')
+    parser.add_argument('--out', help='file for the json results, printed when missing')
+    args = parser.parse_args(argv)
+
+    grid: dict = {}
+    if args.grid:
+        with open(args.grid, encoding='utf-8') as file:
+            grid = json.load(file)
+    problem: Optional[str] = check_grid(grid)
+    if problem:
+        parser.error(problem)
+
+    jobs: List[dict] = [{'params': params, 'strategy': strategy, 'seed': seed, 'days': args.days, 'field': args.field}
+                        for params in expand(grid) for strategy in args.strategies for seed in range(args.seeds)]
+    start: float = time.perf_counter()
+    if args.workers == 1:
+        init_worker()
+        runs: List[dict] = [simulate(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(args.workers, initializer=init_worker) as pool:
+            runs = list(pool.map(simulate, jobs, chunksize=max(1, len(jobs) // (args.workers * 4))))
+    seconds: float = time.perf_counter() - start
+
+    results: List[dict] = aggregate(runs)
+    report: dict = {'days': args.days, 'field': args.field, 'runs': len(runs), 'workers': args.workers,
+                    'seconds': round(seconds, 3), 'results': results}
+    text: str = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+    print(f'{len(runs)} seasons in {seconds:.1f}s on {args.workers} workers', file=sys.stderr)
+    for result in results[:10]:
+        print(f'{np.mean(result["money"]["final"]):>10.1f}  {result["strategy"]:<14} {json.dumps(result["params"])}',
+              file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+'''benchmark of the level's hot paths on synthetic worlds many times the shipped map'''
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+import numpy as np
+import pygame
+from src.settings import LAYERS, TILE_SIZE
+from src.assets import assets
+from src.chunks import Chunk
+from src.headless import init_display, HeadlessRunner
+from src.inputs import ScriptedKeys
+from src.level import Level
+from src.soil_grid import SoilGrid, FARMABLE, TILLED
+from src.sprites import Generic, Tree, Wildflower
+from typing import Callable, Dict, List, Optional
+
+CASES: List[str] = ['custom_draw', 'player_collision', 'create_soil_tiles', 'water_all', 'update_plants',
+                    'plant_collision']
+
+def copy_map(level: Level, ground: List[Chunk], offset: tuple[int, int]) -> None:
+    '''one more copy of the map's ground, trees, flowers, fences and borders'''
+    tmx_data = assets.tmx(os.getcwd() + '/data/map.tmx')
+    dx, dy = offset
+    for chunk in ground:
+        # subsurfaces of the shared ground, the copies cost no pixels
+        Chunk(chunk.rect.move(dx, dy).topleft, chunk.image, level.all_sprites, LAYERS['ground'])
+    for obj in tmx_data.get_layer_by_name('Trees'):
+        Tree((obj.x + dx, obj.y + dy), obj.image,
+             [level.all_sprites, level.collision_sprites, level.tree_sprites], obj.name, level.player_add,
+             level.scheduler)
+    for obj in tmx_data.get_layer_by_name('Decoration'):
+        Wildflower((obj.x + dx, obj.y + dy), obj.image, [level.all_sprites, level.collision_sprites])
+    for x, y, surf in tmx_data.get_layer_by_name('Fence').tiles():
+        Generic((x * TILE_SIZE + dx, y * TILE_SIZE + dy), surf, [level.all_sprites, level.collision_sprites])
+    for x, y, _ in tmx_data.get_layer_by_name('Collision').tiles():
+        Generic((x * TILE_SIZE + dx, y * TILE_SIZE + dy), pygame.Surface((TILE_SIZE, TILE_SIZE)),
+                [level.collision_sprites])
+
+def build_world(scale: int, seed: int) -> HeadlessRunner:
+    '''a level with scale copies of the map laid out in a square, every farmable tile tilled and half planted'''
+    runner: HeadlessRunner = HeadlessRunner(ScriptedKeys([]), seed=seed, raining=False)
+    level: Level = runner.level
+    soil_layer = level.soil_layer
+    level.world.load_all()
+    rows, cols = soil_layer.grid.shape
+    columns: int = math.ceil(math.sqrt(scale))
+    farmable: np.ndarray = soil_layer.grid.cells & FARMABLE
+    ground: List[Chunk] = [sprite for sprite in level.all_sprites.sprites()
+                           if isinstance(sprite, Chunk) and sprite.z == LAYERS['ground']]
+    grid: SoilGrid = SoilGrid(rows * math.ceil(scale / columns), cols * columns)
+    for copy in range(scale):
+        row, column = divmod(copy, columns)
+        grid.cells[row * rows:(row + 1) * rows, column * cols:(column + 1) * cols] = farmable
+        if copy:
+            copy_map(level, ground, (column * cols * TILE_SIZE, row * rows * TILE_SIZE))
+    soil_layer.grid = grid
+    # the copies are not streamed, every cell keeps its sprites
+    soil_layer.active_chunks = None
+
+    grid.cells[(grid.cells & FARMABLE) != 0] |= TILLED
+    soil_layer.create_soil_tiles()
+    for index, (x, y) in enumerate(grid.where(TILLED)):
+        if index % 2 == 0:
+            soil_layer.plant_seed(pygame.math.Vector2((x + 0.5) * TILE_SIZE, (y + 0.5) * TILE_SIZE),
+                                  level.player.seeds[index // 2 % len(level.player.seeds)])
+
+    # the player stands where the middle copy has it
+    row, column = divmod(scale // 2, columns)
+    player = level.player
+    player.rect.move_ip(column * cols * TILE_SIZE, row * rows * TILE_SIZE)
+    player.hitbox.center = player.rect.center
+    player.pos = pygame.math.Vector2(player.rect.center)
+    level.all_sprites.flush()
+    level.collision_sprites.flush()
+    return runner
+
+def cases(level: Level) -> Dict[str, tuple[Callable[[], None], Optional[Callable[[], None]]]]:
+    '''every hot path as (timed call, untimed setup run before each call)'''
+    soil_layer = level.soil_layer
+    player = level.player
+
+    def collide() -> None:
+        player.collision('horizontal')
+        player.collision('vertical')
+
+    def replant() -> None:
+        soil_layer.water_all()
+        soil_layer.crops.age[:] = 0
+        soil_layer.sync_plants()
+
+    return {
+        'custom_draw': (lambda: level.all_sprites.custom_draw(player), None),
+        'player_collision': (collide, None),
+        'create_soil_tiles': (soil_layer.create_soil_tiles, None),
+        'water_all': (soil_layer.water_all, soil_layer.remove_water),
+        'update_plants': (soil_layer.update_plants, replant),
+        'plant_collision': (level.plant_collision, None)
+    }
+
+def measure(call: Callable[[], None], setup: Optional[Callable[[], None]], warmup: int,
+            repeats: int) -> Dict[str, float]:
+    '''milliseconds per call after the warm-up calls'''
+    times: List[float] = []
+    for run in range(warmup + repeats):
+        if setup:
+            setup()
+        start: float = time.perf_counter()
+        call()
+        if run >= warmup:
+            times.append((time.perf_counter() - start) * 1000)
+    return {'median_ms': statistics.median(times), 'mean_ms': statistics.fmean(times), 'min_ms': min(times),
+            'max_ms': max(times), 'repeats': repeats}
+
+def run(args: argparse.Namespace) -> int:
+    '''timing every case at every scale and writing the results'''
+    init_display()
+    results: Dict[str, Dict[str, object]] = {}
+    for scale in args.scales:
+        level: Level = build_world(scale, args.seed).level
+        timings: Dict[str, Dict[str, float]] = {name: measure(call, setup, args.warmup, args.repeats)
+                                      for name, (call, setup) in cases(level).items() if name in args.cases}
+        results[f'{scale}x'] = {
+            'sprites': len(level.all_sprites),
+            'collision_sprites': len(level.collision_sprites),
+            'soil_tiles': len(level.soil_layer.soil_tiles),
+            'plants': len(level.soil_layer.plants),
+            'cases': timings
+        }
+        for name, timing in timings.items():
+            print(f'{scale:>3}x {name:<18} {timing["median_ms"]:>10.3f} ms', file=sys.stderr)
+    report: Dict[str, object] = {'seed': args.seed, 'warmup': args.warmup, 'repeats': args.repeats,
+                                 'results': results}
+    text: str = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+def compare(args: argparse.Namespace) -> int:
+    '''flagging every case whose median got slower than the baseline by more than the tolerance and the noise'''
+    with open(args.baseline, encoding='utf-8') as file:
+        baseline: dict = json.load(file)['results']
+    with open(args.current, encoding='utf-8') as file:
+        current: dict = json.load(file)['results']
+    regressions: int = 0
+    print(f'{"scale":>5} {"case":<18} {"baseline ms":>12} {"current ms":>12} {"change":>8}')
+    for scale, result in current.items():
+        for name, timing in result['cases'].items():
+            before: Optional[dict] = baseline.get(scale, {}).get('cases', {}).get(name)
+            if before is None:
+                continue
+            change: float = timing['median_ms'] / before['median_ms'] - 1 if before['median_ms'] else 0.0
+            flag: str = ''
+            if change > args.tolerance and timing['median_ms'] - before['median_ms'] > args.noise_ms:
+                regressions += 1
+                flag = ' REGRESSION'
+            print(f'{scale:>5} {name:<18} {before["median_ms"]:>12.3f} {timing["median_ms"]:>12.3f} '
+                  f'{change:>+7.0%}{flag}')
+    return 1 if regressions else 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    '''running or comparing the benchmark'''
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='time the hot paths and write the results as json')
+    run_parser.add_argument('--scales', type=int, nargs='+', default=[1, 4, 16, 64])
+    run_parser.add_argument('--cases', nargs='+', choices=CASES, default=CASES)
+    run_parser.add_argument('--warmup', type=int, default=3)
+    run_parser.add_argument('--repeats', type=int, default=15)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--out', help='file for the json results, printed when missing')
+    compare_parser = commands.add_parser('compare', help='flag regressions of a run against a baseline run')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown of a median')
+    compare_parser.add_argument('--noise-ms', type=float, default=0.05,
+                                help='slowdowns smaller than this many milliseconds are never flagged')
+    args = parser.parse_args(argv)
+    return run(args) if args.command == 'run' else compare(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
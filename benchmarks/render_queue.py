@@ -0,0 +1,78 @@
+'''benchmark of the camera render queue against the old per-layer sort'''
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+import argparse
+import time
+from random import Random
+import pygame
+from src.settings import LAYERS, SCREEN_WIDTH, SCREEN_HEIGHT
+from src.sprites import Generic
+from src.camera import CameraGroup
+from typing import Callable, List
+
+WORLD_SIZE = (3200, 2560)
+MOVING_SHARE = 0.05
+
+class Mover(Generic):
+    '''a sprite the render queue sorts again every frame'''
+    moving: bool = True
+
+def legacy_draw(group: CameraGroup, player: Generic) -> None:
+    '''the custom_draw this queue replaced: one full sort and scan per layer'''
+    group.offset.x = player.rect.centerx - SCREEN_WIDTH / 2
+    group.offset.y = player.rect.centery - SCREEN_HEIGHT / 2
+    for layer in LAYERS.values():
+        for sprite in sorted(group.sprites(), key=lambda sprite: [sprite.rect.centery]):
+            if sprite.z == layer:
+                offset_rect = sprite.rect.copy()
+                offset_rect.center -= group.offset
+                group.display_surface.blit(sprite.image, offset_rect)
+
+def populate(count: int, seed: int) -> tuple[CameraGroup, Generic, List[Generic]]:
+    '''building a world of count sprites spread over every layer'''
+    rng: Random = Random(seed)
+    group: CameraGroup = CameraGroup()
+    surf: pygame.Surface = pygame.Surface((16, 16))
+    layers: List[int] = list(LAYERS.values())
+    movers: List[Generic] = []
+    for _ in range(count - 1):
+        pos: tuple[int, int] = (rng.randrange(WORLD_SIZE[0]), rng.randrange(WORLD_SIZE[1]))
+        if rng.random() < MOVING_SHARE:
+            movers.append(Mover(pos, surf, [group], LAYERS['rain drops']))
+        else:
+            Generic(pos, surf, [group], rng.choice(layers))
+    player: Generic = Mover((WORLD_SIZE[0] // 2, WORLD_SIZE[1] // 2), surf, [group])
+    movers.append(player)
+    return group, player, movers
+
+def measure(draw: Callable[[], None], movers: List[Generic], frames: int) -> float:
+    '''mean milliseconds per frame'''
+    draw()
+    start: float = time.perf_counter()
+    for _ in range(frames):
+        for sprite in movers:
+            sprite.rect.move_ip(-2, 4)
+        draw()
+    return (time.perf_counter() - start) / frames * 1000
+
+def main() -> None:
+    '''running the benchmark'''
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--frames', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    print(f'{"sprites":>8} {"legacy ms":>10} {"queue ms":>10} {"speedup":>8}')
+    for size in args.sizes:
+        group, player, movers = populate(size, args.seed)
+        # the old path is quadratic in layers, a few frames are enough to see it
+        legacy: float = measure(lambda: legacy_draw(group, player), movers, max(1, args.frames // 10))
+        queue: float = measure(lambda: group.custom_draw(player), movers, args.frames)
+        print(f'{size:>8} {legacy:>10.2f} {queue:>10.2f} {legacy / queue:>7.1f}x')
+
+if __name__ == '__main__':
+    main()
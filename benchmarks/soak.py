@@ -0,0 +1,191 @@
+'''long-running headless soak test that fails when sprites or memory keep growing'''
+import argparse
+import json
+import sys
+import tracemalloc
+from collections import Counter
+import pygame
+from src.headless import init_display, HeadlessRunner
+from src.inputs import ScriptedKeys
+from src.settings import TILE_SIZE, PLAYER_TOOL_OFFSET
+from src.soil_grid import FARMABLE
+from typing import Dict, List, Optional
+
+class SoakTest:
+    '''the same farming day played over and over'''
+    def __init__(self, field: int, seed: int) -> None:
+        self.runner: HeadlessRunner = HeadlessRunner(ScriptedKeys([]), seed=seed)
+        self.level = self.runner.level
+        self.player = self.level.player
+        self.field: List[tuple[int, int]] = self.level.soil_layer.grid.where(FARMABLE)[:field]
+
+    def aim(self, target: tuple[float, float]) -> None:
+        '''standing the player so that its tools reach a world position'''
+        self.player.status = 'down_idle'
+        center: pygame.math.Vector2 = pygame.math.Vector2(target) - PLAYER_TOOL_OFFSET['down']
+        self.player.rect.center = (round(center.x), round(center.y))
+        self.player.hitbox.center = self.player.rect.center
+        self.player.pos = pygame.math.Vector2(self.player.rect.center)
+        self.level.world.stream(self.player.rect.center)
+
+    def use(self, tool: str, target: tuple[float, float]) -> None:
+        '''using a tool on a world position the way the tool timer does'''
+        self.aim(target)
+        self.player.selected_tool = tool
+        self.player.use_tool()
+
+    def farm(self) -> None:
+        '''tilling, watering, planting and harvesting the field, and chopping a tree'''
+        soil_layer = self.level.soil_layer
+        for x, y in self.field:
+            center: tuple[float, float] = ((x + 0.5) * TILE_SIZE, (y + 0.5) * TILE_SIZE)
+            self.use('hoe', center)
+            self.use('water', center)
+            self.use('water', center)
+            plant = soil_layer.plants.get((x, y))
+            if plant and plant.harvestable:
+                self.player.hitbox.center = plant.rect.center
+                self.level.plant_collision()
+            elif not plant:
+                self.player.selected_seed = self.player.seeds[(x + y) % len(self.player.seeds)]
+                self.player.seed_inventory[self.player.selected_seed] += 1
+                self.player.use_seed()
+        for tree in self.level.tree_sprites.sprites()[:2]:
+            self.use('axe', tree.rect.center)
+
+    def sleep(self) -> None:
+        '''going to bed and waiting for the next morning'''
+        self.player.sleep = True
+        while self.player.sleep:
+            self.runner.step()
+
+    def undrawn_resets(self, nights: int) -> int:
+        '''nights passed without drawing, the way the economy and fast_forward pass them, and the most sprites
+        the render queue held waiting for a draw'''
+        most: int = 0
+        for _ in range(nights):
+            self.level.reset()
+            most = max(most, len(self.level.all_sprites.pending))
+        return most
+
+    def work_day(self, frames: int) -> None:
+        '''farming and idling until evening, when the field is watered whatever the weather'''
+        self.farm()
+        self.runner.run(frames)
+
+    def census(self) -> Dict[str, Dict[str, int]]:
+        '''sprites per group, class and layer'''
+        level = self.level
+        groups: Dict[str, int] = {
+            'all_sprites': len(level.all_sprites),
+            'collision_sprites': len(level.collision_sprites),
+            'tree_sprites': len(level.tree_sprites),
+            'interaction_sprites': len(level.interaction_sprites),
+            'soil_sprites': len(level.soil_layer.soil_sprites),
+            'water_sprites': len(level.soil_layer.water_sprites),
+            'plant_sprites': len(level.soil_layer.plant_sprites),
+            'apple_sprites': sum(len(tree.apple_sprites) for tree in level.tree_sprites),
+            'camera_index': len(level.all_sprites.sprite_layers) + len(level.all_sprites.pending),
+            'collision_index': len(level.collision_sprites.grid),
+            'scheduled': len(level.scheduler)
+        }
+        return {
+            'groups': groups,
+            'classes': dict(Counter(type(sprite).__name__ for sprite in level.all_sprites)),
+            'layers': {str(z): count for z, count in Counter(sprite.z for sprite in level.all_sprites).items()}
+        }
+
+def window_peak(days: List[dict]) -> Dict[str, Dict[str, int]]:
+    '''the highest count of everything over some days, so weather and harvests even out'''
+    peak: Dict[str, Dict[str, int]] = {'groups': {}, 'classes': {}, 'layers': {}, 'memory': {}}
+    for day in days:
+        for section in ('groups', 'classes', 'layers'):
+            for name, count in day[section].items():
+                peak[section][name] = max(peak[section].get(name, 0), count)
+        peak['memory']['traced_bytes'] = max(peak['memory'].get('traced_bytes', 0), day['traced_bytes'])
+    return peak
+
+def growth_failures(first: Dict[str, Dict[str, int]], last: Dict[str, Dict[str, int]],
+                    share: float, slack: int) -> List[str]:
+    '''every count that grew by more than share of its start plus slack'''
+    failures: List[str] = []
+    for section, counts in last.items():
+        for name, count in counts.items():
+            start: int = first[section].get(name, 0)
+            if count > start * (1 + share) + slack:
+                failures.append(f'{section}.{name}: {start} -> {count}')
+    return failures
+
+def snapshot() -> tracemalloc.Snapshot:
+    '''the memory traced right now, without what tracemalloc itself holds'''
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+def top_growth(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, top: int) -> List[str]:
+    '''the lines whose allocations grew the most from one snapshot to the other'''
+    return [str(stat) for stat in after.compare_to(before, 'lineno')[:top] if stat.size_diff > 0]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    '''running the soak test, exit code 1 when something leaks'''
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--days', type=int, default=28)
+    parser.add_argument('--warmup-days', type=int, default=7,
+                        help='days whose peaks are the baseline, compared with the peaks of as many last days')
+    parser.add_argument('--frames-per-day', type=int, default=120, help='idle frames played each day before sleeping')
+    parser.add_argument('--field', type=int, default=40, help='farmable tiles worked every day')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--sprite-growth', type=float, default=0.1, help='allowed growth of any sprite count')
+    parser.add_argument('--sprite-slack', type=int, default=20, help='sprites any count may grow by on top of that')
+    parser.add_argument('--memory-growth', type=float, default=0.1, help='allowed growth of traced memory')
+    parser.add_argument('--memory-slack', type=int, default=256 * 1024, help='bytes of traced memory allowed on top of that')
+    parser.add_argument('--undrawn-resets', type=int, default=20,
+                        help='nights passed at the end without drawing, the render queue may not outgrow the sprites')
+    parser.add_argument('--top-growth', type=int, default=5, help='lines of allocation growth reported for every day')
+    parser.add_argument('--out', help='file for the json report, printed when missing')
+    args = parser.parse_args(argv)
+
+    init_display()
+    tracemalloc.start()
+    soak: SoakTest = SoakTest(args.field, args.seed)
+    days: List[dict] = []
+    window: int = max(1, min(args.warmup_days, args.days // 2))
+    # the snapshot at the end of the previous day, each day's growth is measured against it
+    previous: tracemalloc.Snapshot = snapshot()
+    baseline: Optional[tracemalloc.Snapshot] = None
+    for day in range(1, args.days + 1):
+        soak.work_day(args.frames_per_day)
+        days.append(dict(soak.census(), day=day, traced_bytes=tracemalloc.get_traced_memory()[0]))
+        soak.sleep()
+        current: tracemalloc.Snapshot = snapshot()
+        days[-1]['top_growth'] = top_growth(previous, current, args.top_growth)
+        previous = current
+        if day == window:
+            baseline = current
+    tracemalloc.stop()
+    pending: int = soak.undrawn_resets(args.undrawn_resets)
+
+    first: Dict[str, Dict[str, int]] = window_peak(days[:window])
+    last: Dict[str, Dict[str, int]] = window_peak(days[-window:])
+    memory: Dict[str, Dict[str, int]] = {'memory': first.pop('memory')}
+    failures: List[str] = growth_failures(first, {key: last[key] for key in first}, args.sprite_growth, args.sprite_slack)
+    failures += growth_failures(memory, {'memory': last['memory']}, args.memory_growth, args.memory_slack)
+    if pending > len(soak.level.all_sprites):
+        failures.append(f'camera.pending: {pending} queued for {len(soak.level.all_sprites)} sprites')
+
+    report: dict = {
+        'days': days,
+        'failures': failures,
+        'camera_pending': pending,
+        'top_growth': top_growth(baseline, previous, 10) if baseline else []
+    }
+    text: str = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+    for failure in failures:
+        print(f'leak: {failure}', file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
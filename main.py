@@ -1,30 +1,124 @@
 '''the main game module'''
 import sys # import sys module
+import argparse
+import json
+import random
 import pygame # import pygame module
-from src.settings import SCREEN_WIDTH, SCREEN_HEIGHT
+from src.settings import SCREEN_WIDTH, SCREEN_HEIGHT, IDLE_FPS, FIXED_STEP, MAX_FPS, SIM_RATE
 from src.level import Level
+from src.savegame import SaveFile
+from src.loading import LoadingScreen, StartupReport, preload
+from src.assets import assets
+from src.profiler import profiler
+from src.loop import FixedStep, FramePacer
+from src.inputs import Keyboard
+from src.replay import Recording, RecordingKeys, ReplayKeys
+from typing import Optional
 
 class Game:
     ''' Initialize the game'''
-    def __init__(self) -> None:
-        pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption('Farm Game')
-        self.clock = pygame.time.Clock()
-        self.level = Level()
+    def __init__(self, controls: Optional[Keyboard] = None, recording: Optional[Recording] = None) -> None:
+        self.startup = StartupReport()
+        with self.startup.stage('display'):
+            pygame.init()
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption('Farm Game')
+        preload(self.startup, LoadingScreen(self.screen))
+        # a recorded session starts from a new farm and the recording's seed, and leaves the save alone
+        self.recording = recording
+        if recording:
+            random.seed(recording.seed)
+        with self.startup.stage('level'):
+            self.level = Level(controls)
+        if recording:
+            if recording.raining is not None:
+                self.level.raining = self.level.soil_layer.raining = recording.raining
+            self.level.controls.watch(self.level)
+            return
+        with self.startup.stage('save'):
+            self.level.autosave = SaveFile()
+            if self.level.autosave.exists():
+                try:
+                    self.level.autosave.load(self.level)
+                except ValueError as error:
+                    print(f'starting a new farm, the save could not be loaded: {error}', file=sys.stderr)
 
-    def run(self) -> None: 
+    def quit(self) -> None:
+        '''finishing a recording or playback and closing the window'''
+        self.level.controls.close()
+        pygame.quit()
+
+    def run(self, max_fps: int = MAX_FPS, fixed_step: bool = FIXED_STEP) -> None:
         '''Run the game'''
+        controls = self.level.controls
+        pacer = FramePacer()
+        steps = FixedStep(self.recording.dt) if self.recording else FixedStep()
+        fixed_step = fixed_step or self.recording is not None
+        idle = False
         while True:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.quit()
+                    return
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    profiler.toggle()
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                    profiler.dump_json('profile.json')
+                    profiler.dump_csv('profile.csv')
+                if event.type == pygame.WINDOWEXPOSED:
+                    self.level.dirty.invalidate()
 
-            dt = self.clock.tick() / 1000
-            self.level.run(dt)
-            pygame.display.update()
+            # a frame that changed nothing is not pushed, and the next one waits instead of spinning
+            elapsed = pacer.wait(min(IDLE_FPS, max_fps or IDLE_FPS) if idle else max_fps)
+            if fixed_step:
+                for _ in range(steps.advance(elapsed)):
+                    if controls.ended():
+                        self.quit()
+                        return
+                    controls.advance()
+                    self.level.step(steps.dt)
+                areas = self.level.render(steps.alpha())
+            else:
+                controls.advance()
+                areas = self.level.run(elapsed)
+            if areas:
+                pygame.display.update(areas)
+            idle = not areas
 
 if __name__== '__main__':
-    game = Game()
-    game.run()
+    if '--headless' in sys.argv[1:]:
+        from src.headless import main
+        main([arg for arg in sys.argv[1:] if arg != '--headless'])
+    else:
+        parser = argparse.ArgumentParser(description='Play the farm game.')
+        parser.add_argument('--startup-report', help='file for the json timings of every startup stage')
+        parser.add_argument('--max-fps', type=int, default=MAX_FPS, help='frames a second at most, 0 for no limit')
+        parser.add_argument('--variable-step', action='store_true',
+                            help='simulate every frame with the time it took instead of in fixed steps')
+        parser.add_argument('--record', help='file to record the keys and seed of a session on a new farm to')
+        parser.add_argument('--replay', help='recording to play back on a new farm')
+        parser.add_argument('--seed', type=int, help='seed of the recorded session, a random one when missing')
+        args = parser.parse_args()
+
+        controls: Optional[Keyboard] = None
+        recording: Optional[Recording] = None
+        replay: Optional[ReplayKeys] = None
+        if args.replay:
+            try:
+                recording = Recording.read(args.replay)
+            except (OSError, ValueError) as error:
+                parser.error(f'the recording could not be read: {error}')
+            controls = replay = ReplayKeys(recording)
+        if args.record:
+            seed: int = args.seed if args.seed is not None else random.getrandbits(64)
+            recording = Recording(recording.dt, recording.seed, recording.raining) if recording else \
+                Recording(1 / SIM_RATE, seed)
+            controls = RecordingKeys(args.record, recording, controls)
+
+        game = Game(controls, recording)
+        if args.startup_report:
+            with open(args.startup_report, 'w', encoding='utf-8') as file:
+                json.dump(dict(game.startup.report(), assets=assets.report()), file, indent=2)
+        game.run(args.max_fps, not args.variable_step)
+        if replay:
+            print(json.dumps(replay.report()), file=sys.stderr)
@@ -0,0 +1,139 @@
+'''the module for loading every asset once and sharing it'''
+import io
+import os
+import time
+from collections import OrderedDict
+import pygame
+from pytmx import TiledMap  # type: ignore
+from pytmx.util_pygame import handle_transformation, smart_convert  # type: ignore
+from src.settings import ASSET_BUDGET
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Key = Tuple[str, ...]
+
+def surface_size(surf: pygame.Surface) -> int:
+    '''bytes of pixel data in a surface'''
+    return surf.get_width() * surf.get_height() * surf.get_bytesize()
+
+def sound_size(sound: pygame.mixer.Sound) -> int:
+    '''bytes of decoded samples in a sound'''
+    frequency, size, channels = pygame.mixer.get_init() or (44100, -16, 2)
+    return int(sound.get_length() * frequency * channels * abs(size) // 8)
+
+class AssetManager:
+    '''a memoizing registry of images, frame folders, sounds, fonts and maps'''
+    def __init__(self, budget: int = ASSET_BUDGET) -> None:
+        self.budget: int = budget
+        self.used: int = 0
+        # least recently used first, evicted from the front once over budget
+        self.cache: 'OrderedDict[Key, Tuple[Any, int]]' = OrderedDict()
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def fetch(self, key: Key, load: Callable[[], Any], size: Callable[[Any], int]) -> Any:
+        '''a cached asset, loaded and timed on a miss'''
+        stats: Dict[str, float] = self.stats.setdefault(key[0], {'hits': 0, 'misses': 0, 'evictions': 0, 'load_time': 0.0})
+        if key in self.cache:
+            stats['hits'] += 1
+            self.cache.move_to_end(key)
+            return self.cache[key][0]
+
+        stats['misses'] += 1
+        start: float = time.perf_counter()
+        asset: Any = load()
+        stats['load_time'] += time.perf_counter() - start
+
+        asset_size: int = size(asset)
+        self.cache[key] = (asset, asset_size)
+        self.used += asset_size
+        self.evict()
+        return asset
+
+    def evict(self) -> None:
+        '''dropping the least recently used assets until the cache fits the budget'''
+        while self.used > self.budget and len(self.cache) > 1:
+            key, (_, asset_size) = self.cache.popitem(last=False)
+            self.used -= asset_size
+            self.stats[key[0]]['evictions'] += 1
+
+    def clear(self) -> None:
+        '''forgetting every cached asset'''
+        self.cache.clear()
+        self.used = 0
+
+    def image(self, path: str, alpha: bool = True, decoded: Optional[pygame.Surface] = None) -> pygame.Surface:
+        '''a shared surface for an image file, converted from an already decoded surface when given'''
+        path = os.path.normpath(path)
+
+        def load() -> pygame.Surface:
+            surf: pygame.Surface = decoded if decoded is not None else pygame.image.load(path)
+            return surf.convert_alpha() if alpha else surf
+        return self.fetch(('image', path, str(alpha)), load, surface_size)
+
+    def share(self, path: str, surf: pygame.Surface) -> pygame.Surface:
+        '''caching a surface already converted for the display, like a part of an atlas page, as an image file's'''
+        return self.fetch(('image', os.path.normpath(path), 'True'), lambda: surf, surface_size)
+
+    def frames(self, path: str) -> List[pygame.Surface]:
+        '''the images of a folder, in directory order'''
+        path = os.path.normpath(path)
+
+        def load() -> List[pygame.Surface]:
+            return [self.image(os.path.join(folder, image)) for folder, _, img_files in os.walk(path)
+                    for image in img_files]
+        # the surfaces are already counted under their image keys
+        return self.fetch(('frames', path), load, lambda _: 0)
+
+    def frames_dict(self, path: str) -> Dict[str, pygame.Surface]:
+        '''the images of a folder by file name without extension'''
+        path = os.path.normpath(path)
+
+        def load() -> Dict[str, pygame.Surface]:
+            return {image.split('.')[0]: self.image(os.path.join(folder, image)) for folder, _, img_files in os.walk(path)
+                    for image in img_files}
+        return self.fetch(('frames_dict', path), load, lambda _: 0)
+
+    def sound(self, path: str, data: Optional[bytes] = None) -> pygame.mixer.Sound:
+        '''a shared sound, from the bytes of its file when given; every user of a file should set the same volume'''
+        path = os.path.normpath(path)
+        return self.fetch(('sound', path), lambda: pygame.mixer.Sound(io.BytesIO(data) if data else path), sound_size)
+
+    def font(self, path: str, size: int) -> pygame.font.Font:
+        '''a shared font at one size'''
+        path = os.path.normpath(path)
+        return self.fetch(('font', path, str(size)), lambda: pygame.font.Font(path, size), lambda _: 0)
+
+    def text(self, path: str, size: int, text: str, color: str = 'Black', antialias: bool = False) -> pygame.Surface:
+        '''a shared rendering of a line of text, most labels only ever show a few different values'''
+        path = os.path.normpath(path)
+        return self.fetch(('text', path, str(size), text, str(color), str(antialias)),
+                          lambda: self.font(path, size).render(text, antialias, color), surface_size)
+
+    def tmx(self, path: str) -> Any:
+        '''a parsed tiled map, its tileset images shared with the image cache'''
+        path = os.path.normpath(path)
+        return self.fetch(('tmx', path), lambda: TiledMap(path, image_loader=self.tileset_loader), lambda _: 0)
+
+    def tileset_loader(self, filename: str, colorkey: Any, **kwargs: Any) -> Callable[..., pygame.Surface]:
+        '''pytmx's pygame image loader, cutting the tiles from the cached image of the tileset'''
+        if colorkey:
+            colorkey = pygame.Color(f'#{colorkey}')
+        pixelalpha: bool = kwargs.get('pixelalpha', True)
+        image: pygame.Surface = self.image(filename)
+
+        def load_tile(rect: Optional[pygame.Rect] = None, flags: Any = None) -> pygame.Surface:
+            tile: pygame.Surface = image.subsurface(rect) if rect else image.copy()
+            if flags:
+                tile = handle_transformation(tile, flags)
+            return smart_convert(tile, colorkey, pixelalpha)
+        return load_tile
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        '''hits, misses, hit rate, evictions and load time per kind of asset'''
+        report: Dict[str, Dict[str, float]] = {}
+        for kind, stats in self.stats.items():
+            lookups: float = stats['hits'] + stats['misses']
+            report[kind] = dict(stats, hit_rate=stats['hits'] / lookups if lookups else 0.0)
+        report['cache'] = {'assets': len(self.cache), 'bytes': self.used, 'budget': self.budget}
+        return report
+
+assets: AssetManager = AssetManager()
@@ -0,0 +1,117 @@
+'''the module for the baked asset cache: every image packed into atlas pages of raw pixels in one file'''
+import os
+import json
+import mmap
+import struct
+import numpy as np
+import pygame
+from src.settings import ATLAS_FILE, ATLAS_WIDTH
+from typing import Dict, List, Optional, Tuple
+
+MAGIC = b'FARMATLS'
+VERSION = 1
+# magic, version and length of the json table that follows
+FILE_HEADER = struct.Struct('<8sII')
+# pages start on memory pages, so each can be handed to pygame where it lies
+ALIGN = mmap.PAGESIZE
+
+# page and rect of an image in the atlas
+Place = Tuple[int, int, int, int, int]
+
+def sources(paths: List[str]) -> Dict[str, List[int]]:
+    '''modification time and size of every source image, by path relative to the game folder'''
+    found: Dict[str, List[int]] = {}
+    for path in paths:
+        stat: os.stat_result = os.stat(path)
+        found[os.path.relpath(path)] = [stat.st_mtime_ns, stat.st_size]
+    return found
+
+def pack(sizes: Dict[str, Tuple[int, int]], width: int = ATLAS_WIDTH) -> Tuple[List[Tuple[int, int]], Dict[str, Place]]:
+    '''shelves of images, tallest first, on pages width wide; an image wider than half a page gets one of its own'''
+    pages: List[Tuple[int, int]] = []
+    places: Dict[str, Place] = {}
+    x = y = shelf = 0
+    shared: Optional[int] = None
+    for path in sorted(sizes, key=lambda path: (-sizes[path][1], path)):
+        w, h = sizes[path]
+        if w > width // 2:
+            places[path] = (len(pages), 0, 0, w, h)
+            pages.append((w, h))
+            continue
+        if shared is None:
+            shared = len(pages)
+            pages.append((width, 0))
+        if x + w > width:
+            x, y, shelf = 0, y + shelf, 0
+        places[path] = (shared, x, y, w, h)
+        x += w
+        shelf = max(shelf, h)
+        pages[shared] = (width, max(pages[shared][1], y + shelf))
+    return pages, places
+
+def bake(decoded: Dict[str, pygame.Surface], path: str = ATLAS_FILE) -> None:
+    '''writing the images, converted the way the game uses them, into atlas pages and a table of where they are'''
+    pixels: Dict[str, np.ndarray] = {}
+    for source, surf in decoded.items():
+        w, h = surf.get_size()
+        pixels[os.path.relpath(source)] = np.frombuffer(pygame.image.tobytes(surf.convert_alpha(), 'RGBA'),
+                                                        np.uint8).reshape(h, w, 4)
+    pages, places = pack({name: (array.shape[1], array.shape[0]) for name, array in pixels.items()})
+    table: bytes = json.dumps({'sources': sources(list(decoded)), 'pages': pages, 'images': places}).encode()
+
+    temp: str = path + '.tmp'
+    with open(temp, 'wb') as file:
+        file.write(FILE_HEADER.pack(MAGIC, VERSION, len(table)))
+        file.write(table)
+        for page, (w, h) in enumerate(pages):
+            sheet: np.ndarray = np.zeros((h, w, 4), np.uint8)
+            for name, (on, x, y, iw, ih) in places.items():
+                if on == page:
+                    sheet[y:y + ih, x:x + iw] = pixels[name]
+            file.write(b'\0' * (-file.tell() % ALIGN))
+            file.write(sheet.tobytes())
+    os.replace(temp, path)
+
+def load(paths: List[str], path: str = ATLAS_FILE) -> Optional[Dict[str, pygame.Surface]]:
+    '''every image as a part of an atlas page converted for the display, None when the file is missing, stale or
+    damaged and has to be baked again'''
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        view: Optional[memoryview] = None
+        raw: Optional[pygame.Surface] = None
+        try:
+            if len(buffer) < FILE_HEADER.size:
+                return None
+            magic, version, length = FILE_HEADER.unpack_from(buffer)
+            if magic != MAGIC or version != VERSION or FILE_HEADER.size + length > len(buffer):
+                return None
+            table: dict = json.loads(buffer[FILE_HEADER.size:FILE_HEADER.size + length])
+            if table['sources'] != sources(paths):
+                return None
+
+            sheets: List[pygame.Surface] = []
+            offset: int = FILE_HEADER.size + length
+            for w, h in table['pages']:
+                offset += -offset % ALIGN
+                size: int = w * h * 4
+                if w <= 0 or h <= 0 or offset + size > len(buffer):
+                    return None
+                view = memoryview(buffer)[offset:offset + size]
+                # the raw page is only looked at long enough to copy it into the display's format
+                raw = pygame.image.frombuffer(view, (w, h), 'RGBA')
+                sheets.append(raw.convert_alpha())
+                raw = None
+                view.release()
+                view = None
+                offset += size
+            return {os.path.join(os.getcwd(), name): sheets[page].subsurface((x, y, w, h))
+                    for name, (page, x, y, w, h) in table['images'].items()}
+        except (ValueError, KeyError, IndexError, TypeError):
+            # json.JSONDecodeError is a ValueError too
+            return None
+        finally:
+            # nothing may view the map once it closes
+            raw = None
+            if view is not None:
+                view.release()
@@ -0,0 +1,133 @@
+'''the module for the camera and its render queue'''
+from itertools import count
+import pygame
+from src.settings import LAYERS, SCREEN_WIDTH, SCREEN_HEIGHT, TILE_SIZE
+from src.spatial import Drawn, SpatialGrid, Span, cell_span
+from typing import Dict, Iterator, List, Optional, Protocol, Set, Tuple
+
+CELL_SIZE = TILE_SIZE * 4
+
+class Batch(Protocol):
+    '''anything that draws many things of one layer at once'''
+    def draw(self, surface: pygame.Surface, camera: pygame.Rect) -> None:
+        '''drawing the part under the camera rect'''
+
+class CameraGroup(pygame.sprite.Group):
+    '''having moveable camera'''
+    def __init__(self) -> None:
+        super().__init__()
+        self.display_surface: pygame.Surface = pygame.display.get_surface()
+        self.offset: pygame.math.Vector2 = pygame.math.Vector2()
+
+        # render queue - one spatial grid per layer, drawn in layer order
+        self.grids: Dict[int, SpatialGrid[Drawn]] = {z: SpatialGrid(CELL_SIZE) for z in sorted(LAYERS.values())}
+        self.sprite_layers: Dict[Drawn, int] = {}
+        self.movers: Dict[int, Set[Drawn]] = {z: set() for z in self.grids}
+        # insertion tickets keep the order of sprites on the same row stable
+        self.order: Dict[Drawn, int] = {}
+        self.tickets: Iterator[int] = count()
+        # sprites are added before their z and rect exist, so they wait here until the next draw; keyed by sprite,
+        # in the order they came, so a sprite removed before then leaves the queue too
+        self.pending: Dict[Drawn, None] = {}
+        # y-sorted sprites of the cells around the camera, kept until the layer or the cells change
+        self.views: Dict[int, Tuple[Optional[Span], List[Drawn]]] = {z: (None, []) for z in self.grids}
+        self.dirty: Set[int] = set()
+        self.batches: Dict[int, List[Batch]] = {z: [] for z in self.grids}
+
+    def add_internal(self, sprite: Drawn, layer: None = None) -> None:
+        '''adding a sprite to the group and queueing it for its layer'''
+        super().add_internal(sprite)
+        self.pending[sprite] = None
+
+    def remove_internal(self, sprite: Drawn) -> None:
+        '''removing a sprite from the group and its layer'''
+        super().remove_internal(sprite)
+        self.order.pop(sprite, None)
+        self.pending.pop(sprite, None)
+        self.unbucket(sprite)
+
+    def unbucket(self, sprite: Drawn) -> None:
+        '''taking a sprite out of its layer grid'''
+        z: Optional[int] = self.sprite_layers.pop(sprite, None)
+        if z is not None:
+            self.grids[z].remove(sprite)
+            self.movers[z].discard(sprite)
+            self.dirty.add(z)
+
+    def restack(self, sprite: Drawn) -> None:
+        '''re-queueing a sprite whose z or position changed'''
+        if sprite in self.sprite_layers:
+            self.unbucket(sprite)
+            self.pending[sprite] = None
+
+    def flush(self) -> None:
+        '''bucketing the pending sprites'''
+        for sprite in self.pending:
+            if sprite not in self.spritedict or sprite in self.sprite_layers:
+                continue
+            z: int = sprite.z
+            self.sprite_layers[sprite] = z
+            if sprite not in self.order:
+                self.order[sprite] = next(self.tickets)
+            self.grids[z].insert(sprite)
+            if getattr(sprite, 'moving', False):
+                self.movers[z].add(sprite)
+            self.dirty.add(z)
+        self.pending.clear()
+
+    def depth(self, sprite: Drawn) -> Tuple[int, int]:
+        '''y-sort key of a sprite'''
+        return sprite.rect.centery, self.order[sprite]
+
+    def add_batch(self, z: int, batch: Batch) -> None:
+        '''drawing a batch, like the rain, right after the sprites of its layer'''
+        self.batches[z].append(batch)
+
+    def layer_views(self, camera: pygame.Rect) -> List[Tuple[int, List[Drawn]]]:
+        '''per layer, the sprites in the cells under the camera rect in drawing order'''
+        if self.pending:
+            self.flush()
+        span: Span = cell_span(camera, CELL_SIZE)
+        views: List[Tuple[int, List[Drawn]]] = []
+        for z, grid in self.grids.items():
+            view_span, view = self.views[z]
+            rebuild: bool = z in self.dirty or view_span != span
+            for sprite in self.movers[z]:
+                rebuild = grid.move(sprite) or rebuild
+            if rebuild:
+                view = sorted(grid.query_span(span), key=self.depth)
+                self.views[z] = (span, view)
+            elif self.movers[z]:
+                # only the members moved, timsort is close to linear on the almost ordered view
+                view.sort(key=self.depth)
+            views.append((z, view))
+        self.dirty.clear()
+        return views
+
+    def camera_rect(self) -> pygame.Rect:
+        '''the part of the world on screen'''
+        return pygame.Rect(int(self.offset.x), int(self.offset.y), SCREEN_WIDTH, SCREEN_HEIGHT)
+
+    def follow(self, player: Drawn) -> pygame.Rect:
+        '''centring the camera on the player, returning the part of the world on screen'''
+        self.offset.x = player.rect.centerx - SCREEN_WIDTH / 2
+        self.offset.y = player.rect.centery - SCREEN_HEIGHT / 2
+        return self.camera_rect()
+
+    def draw_views(self, views: List[Tuple[int, List[Drawn]]], camera: pygame.Rect,
+                   area: Optional[pygame.Rect] = None) -> None:
+        '''drawing the layer views, only the sprites over an area of the screen when given'''
+        offset_x: int = -camera.x
+        offset_y: int = -camera.y
+        for z, view in views:
+            placed = [(sprite.image, sprite.rect.move(offset_x, offset_y)) for sprite in view]
+            if area is not None:
+                placed = [(image, rect) for image, rect in placed if area.colliderect(rect)]
+            self.display_surface.blits(placed, False)
+            for batch in self.batches[z]:
+                batch.draw(self.display_surface, camera)
+
+    def custom_draw(self, player: Drawn) -> None:
+        '''custom draw'''
+        camera: pygame.Rect = self.follow(player)
+        self.draw_views(self.layer_views(camera), camera)
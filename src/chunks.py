@@ -0,0 +1,82 @@
+'''the module for baking static tile layers into chunk surfaces'''
+import pygame
+from pygame.surface import Surface
+from pygame.sprite import Group
+from src.settings import TILE_SIZE, CHUNK_SIZE
+from typing import Dict, Iterable, List, Tuple
+
+Tile = Tuple[int, int, Surface]
+
+class Chunk(pygame.sprite.Sprite):
+    '''a block of static tiles drawn with one blit'''
+    def __init__(self, pos: tuple[int, int], surf: Surface, groups: Group, z: int) -> None:
+        super().__init__(groups)
+        self.image: Surface = surf
+        self.rect: pygame.Rect = self.image.get_rect(topleft=pos)
+        self.z: int = z
+
+class AnimatedChunk(Chunk):
+    '''a block of animated tiles sharing one frame clock, like the water'''
+    def __init__(self, pos: tuple[int, int], frames: List[Surface], groups: Group, z: int, speed: float) -> None:
+        self.frames: List[Surface] = frames
+        self.frame_index: float = 0
+        self.speed: float = speed
+        super().__init__(pos, self.frames[0], groups, z)
+
+    def animate(self, dt: float) -> None:
+        '''stepping through the baked frames'''
+        self.frame_index += self.speed * dt
+        if self.frame_index >= len(self.frames):
+            self.frame_index = 0
+        self.image = self.frames[int(self.frame_index)]
+
+    def update(self, dt: float) -> None:
+        '''updating'''
+        self.animate(dt)
+
+def chunk_of(x: int, y: int) -> Tuple[int, int]:
+    '''the chunk a tile falls in'''
+    return (x // CHUNK_SIZE, y // CHUNK_SIZE)
+
+def chunk_tiles(tiles: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], List[Tuple[int, int]]]:
+    '''grouping tile coordinates by the chunk they fall in'''
+    chunks: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+    for x, y in tiles:
+        chunks.setdefault(chunk_of(x, y), []).append((x, y))
+    return chunks
+
+def chunk_bounds(cells: List[Tuple[int, int]]) -> pygame.Rect:
+    '''the tile rect covering the used cells of a chunk, so empty borders cost no memory'''
+    xs: List[int] = [x for x, _ in cells]
+    ys: List[int] = [y for _, y in cells]
+    return pygame.Rect(min(xs), min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1)
+
+def bake_tiles(tiles: Iterable[Tile], groups: Group, z: int) -> List[Chunk]:
+    '''compositing tiles, given in drawing order, into chunk sprites'''
+    surfs: Dict[Tuple[int, int], List[Surface]] = {}
+    for x, y, surf in tiles:
+        surfs.setdefault((x, y), []).append(surf)
+
+    baked: List[Chunk] = []
+    for cells in chunk_tiles(surfs).values():
+        bounds: pygame.Rect = chunk_bounds(cells)
+        chunk_surf: Surface = pygame.Surface((bounds.width * TILE_SIZE, bounds.height * TILE_SIZE), pygame.SRCALPHA)
+        for x, y in cells:
+            for surf in surfs[(x, y)]:
+                chunk_surf.blit(surf, ((x - bounds.x) * TILE_SIZE, (y - bounds.y) * TILE_SIZE))
+        baked.append(Chunk((bounds.x * TILE_SIZE, bounds.y * TILE_SIZE), chunk_surf, groups, z))
+    return baked
+
+def bake_animated(tiles: Iterable[Tuple[int, int]], frames: List[Surface], groups: Group, z: int,
+                  speed: float) -> List[AnimatedChunk]:
+    '''baking one surface per animation frame for every chunk of identical animated tiles'''
+    baked: List[AnimatedChunk] = []
+    for cells in chunk_tiles(tiles).values():
+        bounds: pygame.Rect = chunk_bounds(cells)
+        chunk_frames: List[Surface] = []
+        for frame in frames:
+            chunk_surf: Surface = pygame.Surface((bounds.width * TILE_SIZE, bounds.height * TILE_SIZE), pygame.SRCALPHA)
+            chunk_surf.blits([(frame, ((x - bounds.x) * TILE_SIZE, (y - bounds.y) * TILE_SIZE)) for x, y in cells], False)
+            chunk_frames.append(chunk_surf)
+        baked.append(AnimatedChunk((bounds.x * TILE_SIZE, bounds.y * TILE_SIZE), chunk_frames, groups, z, speed))
+    return baked
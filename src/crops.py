@@ -0,0 +1,118 @@
+'''the module for crop state kept in array columns'''
+import os
+import numpy as np
+from src.settings import GROW_SPEED
+from src.support import import_folder
+from typing import Dict, List, Tuple
+
+Cell = Tuple[int, int]
+
+class Crops:
+    '''type, age and shown frame of every crop on the farm, one array column each'''
+    def __init__(self, capacity: int = 64) -> None:
+        self.types: List[str] = list(GROW_SPEED)
+        self.type_speed: np.ndarray = np.array([GROW_SPEED[plant_type] for plant_type in self.types], np.float64)
+        self.type_max_age: np.ndarray = np.array(
+            [len(import_folder(os.getcwd() + f'/graphics/fruit/{plant_type}')) - 1 for plant_type in self.types],
+            np.float64)
+        self.count: int = 0
+        self.x: np.ndarray = np.zeros(capacity, np.int32)
+        self.y: np.ndarray = np.zeros(capacity, np.int32)
+        self.kind: np.ndarray = np.zeros(capacity, np.uint8)
+        self.age: np.ndarray = np.zeros(capacity, np.float64)
+        self.grow_speed: np.ndarray = np.zeros(capacity, np.float64)
+        self.max_age: np.ndarray = np.zeros(capacity, np.float64)
+        # the frame each crop's sprite shows, or was last told to
+        self.shown: np.ndarray = np.zeros(capacity, np.int16)
+        # row of every cell with a crop and the cell of every row
+        self.rows: Dict[Cell, int] = {}
+        self.cells: List[Cell] = []
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, cell: Cell) -> bool:
+        return cell in self.rows
+
+    def columns(self) -> List[str]:
+        '''names of the per-crop arrays'''
+        return ['x', 'y', 'kind', 'age', 'grow_speed', 'max_age', 'shown']
+
+    def grow_columns(self) -> None:
+        '''doubling the room in every column'''
+        for name in self.columns():
+            column: np.ndarray = getattr(self, name)
+            setattr(self, name, np.concatenate([column, np.zeros_like(column)]))
+
+    def add(self, cell: Cell, plant_type: str, age: float = 0) -> int:
+        '''a new crop on a cell, returning its row'''
+        if self.count == len(self.x):
+            self.grow_columns()
+        row: int = self.count
+        kind: int = self.types.index(plant_type)
+        self.x[row], self.y[row] = cell
+        self.kind[row] = kind
+        self.age[row] = age
+        self.grow_speed[row] = self.type_speed[kind]
+        self.max_age[row] = self.type_max_age[kind]
+        self.shown[row] = int(age)
+        self.rows[cell] = row
+        self.cells.append(cell)
+        self.count += 1
+        return row
+
+    def assign(self, x: np.ndarray, y: np.ndarray, kind: np.ndarray, age: np.ndarray) -> None:
+        '''replacing every crop at once, as when loading a save'''
+        count: int = len(x)
+        capacity: int = max(len(self.x), count)
+        for name, values in (('x', x), ('y', y), ('kind', kind), ('age', age)):
+            column: np.ndarray = np.zeros(capacity, getattr(self, name).dtype)
+            column[:count] = values
+            setattr(self, name, column)
+        self.grow_speed = np.zeros(capacity, np.float64)
+        self.grow_speed[:count] = self.type_speed[self.kind[:count]]
+        self.max_age = np.zeros(capacity, np.float64)
+        self.max_age[:count] = self.type_max_age[self.kind[:count]]
+        self.shown = np.zeros(capacity, np.int16)
+        self.shown[:count] = self.age[:count].astype(np.int16)
+        self.count = count
+        self.cells = list(zip(self.x[:count].tolist(), self.y[:count].tolist()))
+        self.rows = {cell: row for row, cell in enumerate(self.cells)}
+
+    def remove(self, cell: Cell) -> None:
+        '''dropping the crop of a cell, the last row moves into its place'''
+        row: int = self.rows.pop(cell)
+        last: int = self.count - 1
+        moved: Cell = self.cells.pop()
+        if row != last:
+            for name in self.columns():
+                column: np.ndarray = getattr(self, name)
+                column[row] = column[last]
+            self.cells[row] = moved
+            self.rows[moved] = row
+        self.count -= 1
+
+    def plant_type(self, cell: Cell) -> str:
+        '''the seed a crop grew from'''
+        return self.types[self.kind[self.rows[cell]]]
+
+    def age_of(self, cell: Cell) -> float:
+        '''the age of the crop on a cell'''
+        return float(self.age[self.rows[cell]])
+
+    def grow(self, soil: np.ndarray, watered: int) -> None:
+        '''one day of growth for every crop whose cell has the watered flag'''
+        count: int = self.count
+        wet: np.ndarray = (soil[self.y[:count], self.x[:count]] & watered) != 0
+        age: np.ndarray = self.age[:count]
+        # added then clamped in place, the same float steps as growing one plant a day
+        np.add(age, self.grow_speed[:count], out=age, where=wet)
+        np.minimum(age, self.max_age[:count], out=age)
+
+    def changed(self) -> List[Cell]:
+        '''cells whose crop shows another frame than its age calls for, marked as shown'''
+        count: int = self.count
+        frames: np.ndarray = self.age[:count].astype(np.int16)
+        rows: np.ndarray = np.flatnonzero(frames != self.shown[:count])
+        self.shown[rows] = frames[rows]
+        return [self.cells[row] for row in rows]
@@ -0,0 +1,66 @@
+'''the module for finding the parts of the screen that changed since the last drawn frame'''
+import pygame
+from src.spatial import Drawn
+from src.settings import SCREEN_WIDTH, SCREEN_HEIGHT, DIRTY_MAX_RECTS, DIRTY_FULL_SHARE
+from typing import Dict, Hashable, List, Optional, Tuple
+
+# what a sprite looked like on screen: its image, screen rect and layer
+Look = Tuple[pygame.Surface, pygame.Rect, int]
+
+def merge(areas: List[pygame.Rect]) -> List[pygame.Rect]:
+    '''overlapping or touching areas joined into one'''
+    merged: List[pygame.Rect] = []
+    for area in areas:
+        while True:
+            index: int = area.inflate(2, 2).collidelist(merged)
+            if index < 0:
+                break
+            area = area.union(merged.pop(index))
+        merged.append(area)
+    return merged
+
+class DirtyRects:
+    '''the screen areas to draw again, found by comparing every visible sprite with how it was last drawn'''
+    def __init__(self, max_rects: int = DIRTY_MAX_RECTS, full_share: float = DIRTY_FULL_SHARE) -> None:
+        self.screen: pygame.Rect = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.max_rects: int = max_rects
+        self.full_share: float = full_share
+        self.drawn: Dict[Drawn, Look] = {}
+        # whatever changes the whole screen at once, like the camera position or the sky colour,
+        # None while something animates all over it
+        self.scene: Optional[Hashable] = None
+
+    def invalidate(self) -> None:
+        '''drawing the whole screen next frame'''
+        self.scene = None
+
+    def areas(self, scene: Optional[Hashable], views: List[Tuple[int, List[Drawn]]], camera: pygame.Rect,
+              extra: List[pygame.Rect]) -> List[pygame.Rect]:
+        '''the areas that changed, none when the frame would look the same and the whole screen when most did'''
+        offset_x: int = -camera.x
+        offset_y: int = -camera.y
+        drawn: Dict[Drawn, Look] = {sprite: (sprite.image, sprite.rect.move(offset_x, offset_y), z)
+                                                   for z, view in views for sprite in view}
+        full: bool = scene is None or scene != self.scene
+        changed: List[pygame.Rect] = list(extra)
+        if not full:
+            previous: Dict[Drawn, Look] = self.drawn
+            for sprite, look in drawn.items():
+                before: Optional[Look] = previous.get(sprite)
+                if before is None:
+                    changed.append(look[1])
+                elif before[0] is not look[0] or before[1] != look[1] or before[2] != look[2]:
+                    changed.append(before[1])
+                    changed.append(look[1])
+            for sprite in previous.keys() - drawn.keys():
+                changed.append(previous[sprite][1])
+        self.drawn = drawn
+        self.scene = scene
+        if full:
+            return [self.screen]
+
+        areas: List[pygame.Rect] = merge([area.clip(self.screen) for area in changed if area.colliderect(self.screen)])
+        if len(areas) > self.max_rects or \
+                sum(area.width * area.height for area in areas) > self.full_share * self.screen.width * self.screen.height:
+            return [self.screen]
+        return areas
@@ -0,0 +1,153 @@
+'''the module for stepping the level without a window, for benchmarks'''
+import os
+import argparse
+import json
+import random
+import time
+import pygame
+from src.settings import SCREEN_WIDTH, SCREEN_HEIGHT
+from src.inputs import Keyboard, ScriptedKeys
+from src.replay import Recording, RecordingKeys, ReplayKeys
+from src.assets import assets
+from src.profiler import profiler, frame_stats
+from src.loading import StartupReport, preload
+from typing import Dict, List, Optional, Sequence
+
+# a short farming loop from the start position: walk, till, water, plant, walk on
+DEFAULT_SCRIPT: List[dict] = [
+    {'frames': 20, 'keys': ['down']},
+    {'frames': 1, 'keys': ['space']},
+    {'frames': 30},
+    {'frames': 26, 'keys': ['right']},
+    {'frames': 1, 'keys': ['space']},
+    {'frames': 30},
+    {'frames': 1, 'keys': ['q']},
+    {'frames': 15},
+    {'frames': 1, 'keys': ['q']},
+    {'frames': 15},
+    {'frames': 1, 'keys': ['space']},
+    {'frames': 30},
+    {'frames': 1, 'keys': ['left ctrl']},
+    {'frames': 30},
+    {'frames': 26, 'keys': ['left']},
+    {'frames': 1, 'keys': ['space']},
+    {'frames': 30},
+    {'frames': 1, 'keys': ['left ctrl']},
+    {'frames': 30},
+    {'frames': 1, 'keys': ['q']},
+    {'frames': 15},
+    {'frames': 60, 'keys': ['up']},
+    {'frames': 60, 'keys': ['right']},
+    {'frames': 60, 'keys': ['left']},
+    {'frames': 20, 'keys': ['down']},
+]
+
+def init_display() -> pygame.Surface:
+    '''a display surface on SDL's dummy video and audio drivers'''
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    pygame.init()
+    return pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+class HeadlessRunner:
+    '''a level stepped with a fixed dt and scripted keys'''
+    def __init__(self, controls: Keyboard, dt: float = 1 / 60, seed: int = 0,
+                 raining: Optional[bool] = None) -> None:
+        from src.level import Level
+        random.seed(seed)
+        self.controls: Keyboard = controls
+        self.dt: float = dt
+        self.level: Level = Level(controls)
+        # share of the screen drawn by every frame
+        self.drawn: List[float] = []
+        if raining is not None:
+            self.level.raining = raining
+            self.level.soil_layer.raining = raining
+        controls.watch(self.level)
+
+    def step(self) -> float:
+        '''running one frame, returning how long it took in seconds'''
+        self.controls.advance()
+        start: float = time.perf_counter()
+        areas: List[pygame.Rect] = self.level.run(self.dt)
+        elapsed: float = time.perf_counter() - start
+        self.drawn.append(sum(area.width * area.height for area in areas) / (SCREEN_WIDTH * SCREEN_HEIGHT))
+        return elapsed
+
+    def run(self, frames: int) -> List[float]:
+        '''running frames one after another'''
+        return [self.step() for _ in range(frames)]
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, object]:
+    '''running the level headless and printing the frame timings as json'''
+    parser = argparse.ArgumentParser(description='Step the level headless with a fixed dt and report frame timings.')
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--dt', type=float, default=1 / 60)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--script', help='json list of {"frames": n, "keys": [...]} steps, played in a loop')
+    parser.add_argument('--rain', action='store_true', help='make it rain for the whole run')
+    parser.add_argument('--warmup', type=int, default=30, help='frames run before timing starts')
+    parser.add_argument('--out', help='file for the json report, printed when missing')
+    parser.add_argument('--profile', help='file for the per-phase profile, .csv for one row per frame, json otherwise')
+    parser.add_argument('--per-class', action='store_true', help='time the update of each sprite class in the profile')
+    parser.add_argument('--full-redraw', action='store_true', help='draw the whole screen every frame')
+    parser.add_argument('--record', help='file to record the keys and seed of the run to')
+    parser.add_argument('--replay', help='recording to play back instead of the script, with its dt, seed and rain')
+    args = parser.parse_args(argv)
+
+    init_display()
+    script: List[dict] = DEFAULT_SCRIPT
+    if args.script:
+        with open(args.script, encoding='utf-8') as file:
+            script = json.load(file)
+    controls: Keyboard = ScriptedKeys.from_json(script)
+    dt, seed, raining = args.dt, args.seed, True if args.rain else None
+    warmup, frames = args.warmup, args.frames
+    replay: Optional[ReplayKeys] = None
+    if args.replay:
+        recording: Recording = Recording.read(args.replay)
+        controls = replay = ReplayKeys(recording)
+        dt, seed, raining = recording.dt, recording.seed, recording.raining
+        warmup = min(warmup, recording.steps)
+        frames = recording.steps - warmup
+    if args.record:
+        controls = RecordingKeys(args.record, Recording(dt, seed, raining), controls)
+
+    startup: StartupReport = StartupReport()
+    preload(startup)
+    with startup.stage('level'):
+        runner: HeadlessRunner = HeadlessRunner(controls, dt, seed, raining)
+    startup_ms: Dict[str, object] = startup.report()
+    runner.level.dirty_rects = not args.full_redraw
+    runner.run(warmup)
+    if args.profile:
+        profiler.enable(args.per_class)
+    times: List[float] = runner.run(frames)
+    controls.close()
+    if args.profile:
+        if args.profile.endswith('.csv'):
+            profiler.dump_csv(args.profile)
+        else:
+            profiler.dump_json(args.profile)
+
+    report: Dict[str, object] = {
+        'frames': frames,
+        'dt': dt,
+        'seed': seed,
+        'raining': runner.level.raining,
+        'frame_ms': frame_stats(times),
+        'skipped_frames': sum(share == 0 for share in runner.drawn[-frames:]) if frames else 0,
+        'drawn_share': sum(runner.drawn[-frames:]) / frames if frames else 0.0,
+        'sprites': len(runner.level.all_sprites),
+        'startup': startup_ms,
+        'assets': assets.report()
+    }
+    if replay:
+        report['replay'] = replay.report()
+    text: str = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+    return report
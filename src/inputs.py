@@ -0,0 +1,71 @@
+'''the module for where the key presses come from'''
+import pygame
+from typing import TYPE_CHECKING, FrozenSet, Iterable, List, Protocol, Tuple
+if TYPE_CHECKING:
+    from src.level import Level
+
+# every key the game reads while it plays, in the order recordings keep them
+KEYS: Tuple[int, ...] = (pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT, pygame.K_SPACE, pygame.K_q,
+                         pygame.K_e, pygame.K_LCTRL, pygame.K_RETURN, pygame.K_ESCAPE)
+
+class Pressed(Protocol):
+    '''keys held down, looked up by key code like pygame.key.get_pressed()'''
+    def __getitem__(self, key: int) -> bool: ...
+
+class Keyboard:
+    '''the real keyboard'''
+    def get_pressed(self) -> Pressed:
+        '''keys held down right now'''
+        return pygame.key.get_pressed()
+
+    def advance(self) -> None:
+        '''the keyboard has no frames to step through'''
+
+    def watch(self, level: 'Level') -> None:
+        '''the keyboard does not look at the level it plays'''
+
+    def ended(self) -> bool:
+        '''the keyboard never runs out'''
+        return False
+
+    def close(self) -> None:
+        '''the keyboard has nothing to finish'''
+
+class KeyState:
+    '''keys held down in one frame, indexed like pygame.key.get_pressed()'''
+    def __init__(self, pressed: Iterable[int]) -> None:
+        self.pressed: FrozenSet[int] = frozenset(pressed)
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self.pressed
+
+class ScriptedKeys(Keyboard):
+    '''keys played back from a script of (frames, key names) steps'''
+    def __init__(self, script: Iterable[Tuple[int, Iterable[str]]], loop: bool = True) -> None:
+        self.frames: List[KeyState] = []
+        for frames, names in script:
+            state: KeyState = KeyState(pygame.key.key_code(name) for name in names)
+            self.frames.extend([state] * frames)
+        self.loop: bool = loop
+        self.index: int = -1
+
+    @classmethod
+    def from_json(cls, data: List[dict], loop: bool = True) -> 'ScriptedKeys':
+        '''a script written as [{"frames": 60, "keys": ["right", "space"]}, ...]'''
+        return cls(((step['frames'], step.get('keys', [])) for step in data), loop)
+
+    def get_pressed(self) -> KeyState:
+        '''keys held down in the current frame'''
+        if not self.frames or self.index < 0:
+            return KeyState(())
+        if self.loop:
+            return self.frames[self.index % len(self.frames)]
+        return self.frames[self.index] if self.index < len(self.frames) else KeyState(())
+
+    def advance(self) -> None:
+        '''moving on to the next frame'''
+        self.index += 1
+
+    def ended(self) -> bool:
+        '''has a script that does not loop played its last frame'''
+        return not self.loop and self.index + 1 >= len(self.frames)
@@ -2,25 +2,39 @@
 import os
 from random import randint
 import pygame
-from src.settings import TILE_SIZE, LAYERS, SCREEN_HEIGHT, SCREEN_WIDTH
+from src.settings import LAYERS, DIRTY_RECTS
 from src.player import Player
 from src.overlay import Overlay
-from src.sprites import Generic, Water, Wildflower, Tree, Interaction, Particle
+from src.sprites import Interaction, Particle
 from src.transition import Transition
-from pytmx.util_pygame import load_pygame  # type: ignore
-from src.support import import_folder
+from src.assets import assets
 from src.soil import SoilLayer
 from src.menu import Menu
+from src.camera import CameraGroup
+from src.spatial import CollisionGroup
+from src.world import World
+from src.dirty import DirtyRects
+from src.savegame import SaveFile
+from src.sky import Rain, Sky
+from src.inputs import Keyboard
+from src.loading import MUSIC
+from src.profiler import profiler
+from src.timerr import Scheduler
+from typing import List, Optional, Tuple
 
 class Level:
     '''class about the level itself'''
-    def __init__(self) -> None:
+    def __init__(self, controls: Optional[Keyboard] = None) -> None:
         # getting display surface
         self.display_surface: pygame.Surface = pygame.display.get_surface()
+        self.controls: Keyboard = controls or Keyboard()
+
+        # every timer and particle of the level waits on its clock, handed to whatever makes them
+        self.scheduler: Scheduler = Scheduler()
 
         # sprite groups
         self.all_sprites: CameraGroup = CameraGroup()
-        self.collision_sprites: pygame.sprite.Group = pygame.sprite.Group()
+        self.collision_sprites: CollisionGroup = CollisionGroup()
         self.tree_sprites: pygame.sprite.Group = pygame.sprite.Group()
         self.interaction_sprites: pygame.sprite.Group = pygame.sprite.Group()
         self.soil_layer: SoilLayer = SoilLayer(self.all_sprites, self.collision_sprites)
@@ -28,7 +42,6 @@ class Level:
         self.overlay: Overlay = Overlay(self.player)
         self.transition: Transition = Transition(self.reset, self.player)
 
-        from src.sky import Rain, Sky
         # sky
         self.rain: Rain = Rain(self.all_sprites)
         self.raining: bool = randint(0, 10) > 7
@@ -36,46 +49,31 @@ class Level:
         self.sky: Sky = Sky()
 
         # shop
-        self.menu: Menu = Menu(self.player, self.toggle_shop)
+        self.menu: Menu = Menu(self.player, self.toggle_shop, self.scheduler, self.controls)
         self.shop_active: bool = False
 
-        self.success: pygame.mixer.Sound = pygame.mixer.Sound(os.getcwd() + '/audio/success.wav')
+        # drawing only what changed since the last frame
+        self.dirty_rects: bool = DIRTY_RECTS
+        self.dirty: DirtyRects = DirtyRects()
+
+        # where the player stood before the last step and how long the step was, for drawing in between
+        self.player_before: Tuple[int, int] = self.player.rect.center
+        self.step_dt: float = 0.0
+
+        # saving every night, when set
+        self.autosave: Optional[SaveFile] = None
+
+        self.success: pygame.mixer.Sound = assets.sound(os.getcwd() + '/audio/success.wav')
         self.success.set_volume(0.2)
-        self.music: pygame.mixer.Sound = pygame.mixer.Sound(os.getcwd() + '/audio/music.mp3')
-        self.music.set_volume(0.2)
-        self.music.play(loops=-1)
+        # streamed from the file as it plays
+        pygame.mixer.music.load(os.getcwd() + f'/audio/{MUSIC}')
+        pygame.mixer.music.set_volume(0.2)
+        pygame.mixer.music.play(loops=-1)
 
     def setup(self) -> None:
         '''setting up'''
-        tmx_data = load_pygame(os.getcwd() + '/data/map.tmx')
-
-        # house
-        for layer in ['HouseFloor', 'HouseFurnitureBottom']:
-            for x, y, surf in tmx_data.get_layer_by_name(layer).tiles():
-                Generic((x * TILE_SIZE, y * TILE_SIZE), surf, [self.all_sprites], LAYERS['house bottom'])
-
-        for layer in ['HouseWalls', 'HouseFurnitureTop']:
-            for x, y, surf in tmx_data.get_layer_by_name(layer).tiles():
-                Generic((x * TILE_SIZE, y * TILE_SIZE), surf, [self.all_sprites])
-
-        # fence
-        for x, y, surf in tmx_data.get_layer_by_name('Fence').tiles():
-            Generic((x * TILE_SIZE, y * TILE_SIZE), surf, [self.all_sprites, self.collision_sprites])
-        # water
-        water_frames = import_folder(os.getcwd() + '/graphics/water')
-        for x, y, surf in tmx_data.get_layer_by_name('Water').tiles():
-            Water((x * TILE_SIZE, y * TILE_SIZE), water_frames, self.all_sprites)
-        # trees
-        for obj in tmx_data.get_layer_by_name('Trees'):
-            Tree((obj.x, obj.y), obj.image,
-                 [self.all_sprites, self.collision_sprites, self.tree_sprites], obj.name, self.player_add)
-        # wildflowers
-        for obj in tmx_data.get_layer_by_name('Decoration'):
-            Wildflower((obj.x, obj.y), obj.image, [self.all_sprites, self.collision_sprites])
-
-        # collision border
-        for x, y, surf in tmx_data.get_layer_by_name('Collision').tiles():
-            Generic((x * TILE_SIZE, y * TILE_SIZE), pygame.Surface((TILE_SIZE, TILE_SIZE)), [self.collision_sprites])
+        tmx_data = assets.tmx(os.getcwd() + '/data/map.tmx')
+
         # player
         for obj in tmx_data.get_layer_by_name('Player'):
             if obj.name == 'Start':
@@ -86,7 +84,9 @@ class Level:
                     self.tree_sprites,
                     self.interaction_sprites,
                     self.soil_layer,
-                    self.toggle_shop)
+                    self.toggle_shop,
+                    self.scheduler,
+                    self.controls)
             if obj.name == 'Bed':
                 Interaction((obj.x, obj.y), (obj.width, obj.height),
                              self.interaction_sprites, obj.name)
@@ -95,8 +95,10 @@ class Level:
                 Interaction((obj.x, obj.y), (obj.width, obj.height),
                         self.interaction_sprites, obj.name)
 
-        Generic(pos=(0, 0), surf=pygame.image.load(os.getcwd() + '/graphics/world/ground.png').convert_alpha(),
-                groups=[self.all_sprites], z=LAYERS['ground'])
+        # house, fence, water, trees, wildflowers and collision border, by chunk around the player
+        self.world: World = World(tmx_data, self.all_sprites, self.collision_sprites, self.tree_sprites,
+                                  self.soil_layer, self.player_add, self.scheduler)
+        self.world.stream(self.player.rect.center)
 
     def player_add(self, item: str) -> None:
         '''adding items in inventory'''
@@ -109,26 +111,30 @@ class Level:
 
     def reset(self) -> None:
         '''reset'''
-
-        # plants
-        self.soil_layer.update_plants()
-
-        # soil
-        self.soil_layer.remove_water()
-
-        self.raining = randint(0, 10) > 7
+        self.fast_forward(1)
+        if self.autosave:
+            with profiler.phase('transition/autosave'):
+                self.autosave.save(self)
+
+    def fast_forward(self, days: int) -> None:
+        '''sleeping through days without drawing them: crops grow, the soil dries, rain falls and apples grow again'''
+        # plants and soil, in the grid and crop columns
+        for _ in range(days):
+            self.raining = randint(0, 10) > 7
+            self.soil_layer.pass_night(self.raining)
         self.soil_layer.raining = self.raining
-        if self.raining:
-            self.soil_layer.water_all()
+        self.soil_layer.sync_plants()
+        self.soil_layer.sync_water()
 
         # apples on trees
         for tree in self.tree_sprites.sprites():
             for apple in tree.apple_sprites.sprites():
                 apple.kill()
             tree.create_fruit()
+        self.world.reset()
 
         # sky
-        self.sky.start_color = [255, 255, 255]
+        self.sky.morning()
 
     def plant_collision(self) -> None:
         '''collisions with plants'''
@@ -136,46 +142,91 @@ class Level:
             for plant in self.soil_layer.plant_sprites.sprites():
                 if plant.harvestable and plant.rect.colliderect(self.player.hitbox):
                     self.player_add(plant.plant_type)
-                    plant.kill()
-                    Particle(plant.rect.topleft, plant.image, self.all_sprites, LAYERS['main'])
-                    self.soil_layer.grid[plant.rect.centery // TILE_SIZE][plant.rect.centerx // TILE_SIZE].remove('P')
-
-    def run(self, dt: float) -> None:
-        '''run'''
-        # drawing
-        self.display_surface.fill('black')
-        self.all_sprites.custom_draw(self.player)
+                    self.soil_layer.remove_plant(plant)
+                    Particle(plant.rect.topleft, plant.image, self.all_sprites, LAYERS['main'], self.scheduler)
+
+    def run(self, dt: float) -> List[pygame.Rect]:
+        '''run, returning the screen areas that were drawn'''
+        self.step(dt)
+        return self.render()
+
+    def step(self, dt: float) -> None:
+        '''moving the game forward by dt seconds without drawing it'''
+        self.player_before = self.player.rect.center
+        self.step_dt = dt
+        with profiler.phase('timers'):
+            self.scheduler.advance(dt)
+        with profiler.phase('stream'):
+            self.world.stream(self.player.rect.center)
 
         # updates
         if self.shop_active:
-            self.menu.update()
+            with profiler.phase('menu'):
+                self.menu.input()
         else:
-            self.all_sprites.update(dt)
-            self.plant_collision()
-
-        self.overlay.display()
-
-        if self.raining and not self.shop_active:
-            self.rain.update()
-        self.sky.display(dt)
+            with profiler.phase('update'):
+                if profiler.per_class:
+                    profiler.update_by_class(self.all_sprites, dt)
+                else:
+                    self.all_sprites.update(dt)
+            with profiler.phase('plant collision'):
+                self.plant_collision()
+
+        with profiler.phase('rain'):
+            if not self.shop_active:
+                self.rain.update(dt, self.raining)
+        with profiler.phase('sky'):
+            self.sky.update(dt)
 
         if self.player.sleep:
-            self.transition.play()
-
-class CameraGroup(pygame.sprite.Group):
-    '''having moveable camera'''
-    def __init__(self) -> None:
-        super().__init__()
-        self.display_surface: pygame.Surface = pygame.display.get_surface()
-        self.offset: pygame.math.Vector2 = pygame.math.Vector2()
-
-    def custom_draw(self, player: Player) -> None:
-        '''custom draw'''
-        self.offset.x = player.rect.centerx - SCREEN_WIDTH / 2
-        self.offset.y = player.rect.centery - SCREEN_HEIGHT / 2
-        for layer in LAYERS.values():
-            for sprite in sorted(self.sprites(), key=lambda sprite: [sprite.rect.centery]):
-                if sprite.z == layer:
-                    offset_rect = sprite.rect.copy()
-                    offset_rect.center -= self.offset
-                    self.display_surface.blit(sprite.image, offset_rect)
+            with profiler.phase('transition'):
+                self.transition.play(dt)
+
+    def render(self, alpha: float = 1.0) -> List[pygame.Rect]:
+        '''drawing the game alpha of the way from before the last step to after it, returning the areas drawn'''
+        center: Tuple[int, int] = self.player.rect.center
+        if alpha < 1:
+            # the camera follows the player, so it moves smoothly too
+            before = pygame.math.Vector2(self.player_before)
+            self.player.rect.center = round(before.x + (center[0] - before.x) * alpha), \
+                round(before.y + (center[1] - before.y) * alpha)
+        self.rain.behind((1 - alpha) * self.step_dt)
+
+        with profiler.phase('draw'):
+            areas: List[pygame.Rect] = self.draw()
+        self.player.rect.center = center
+
+        profiler.end_frame()
+        if profiler.visible:
+            profiler.draw(self.display_surface)
+        return areas
+
+    def draw(self) -> List[pygame.Rect]:
+        '''drawing the parts of the screen that changed, or all of it without dirty rects'''
+        camera: pygame.Rect = self.all_sprites.follow(self.player)
+        views = self.all_sprites.layer_views(camera)
+        changed: List[pygame.Rect] = self.overlay.changed()
+        if self.shop_active:
+            changed += self.menu.refresh()
+        if not self.dirty_rects:
+            areas: List[pygame.Rect] = [self.display_surface.get_rect()]
+        else:
+            with profiler.phase('draw/dirty rects'):
+                # the camera, sky, darkness and shop change the whole screen, rain and the profile graph every frame
+                scene = None if self.rain.falling() or profiler.visible else \
+                    (camera.topleft, self.sky.tint, self.player.sleep and self.transition.color,
+                     self.shop_active)
+                areas = self.dirty.areas(scene, views, camera, changed)
+
+        for area in areas:
+            self.display_surface.set_clip(area)
+            self.display_surface.fill('black')
+            self.all_sprites.draw_views(views, camera, area if self.dirty_rects else None)
+            self.overlay.display()
+            if self.shop_active:
+                self.menu.draw()
+            self.sky.display()
+            if self.player.sleep:
+                self.transition.draw()
+        self.display_surface.set_clip(None)
+        return areas
@@ -0,0 +1,130 @@
+'''the module for loading the assets from the atlas cache or on threads behind a progress screen, timing every stage'''
+import os
+import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+import pygame
+from src.settings import SCREEN_WIDTH, SCREEN_HEIGHT, LOAD_WORKERS, ATLAS_FOLDERS
+from src.assets import assets
+from src import atlas
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# streamed by pygame.mixer.music while playing instead of decoded whole
+MUSIC: str = 'music.mp3'
+
+class StartupReport:
+    '''milliseconds spent in every stage of starting the game'''
+    def __init__(self) -> None:
+        self.start: float = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        '''timing a stage'''
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def report(self) -> Dict[str, object]:
+        '''the stages in the order they ran and the time since the report was made'''
+        return {'stages_ms': {name: round(ms, 3) for name, ms in self.stages.items()},
+                'total_ms': round((time.perf_counter() - self.start) * 1000, 3)}
+
+class LoadingScreen:
+    '''a progress bar with the name of the stage, drawn at most once a frame'''
+    def __init__(self, surface: pygame.Surface) -> None:
+        self.surface: pygame.Surface = surface
+        self.font_path: str = os.getcwd() + '/font/LycheeSoda.ttf'
+        self.bar: pygame.Rect = pygame.Rect(0, 0, SCREEN_WIDTH // 2, 24)
+        self.bar.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+        self.last: float = 0.0
+
+    def draw(self, stage: str, done: int, total: int) -> None:
+        '''showing how far the loading got'''
+        now: float = time.perf_counter()
+        if done < total and now - self.last < 1 / 60:
+            return
+        self.last = now
+        # the window stays responsive while loading
+        pygame.event.pump()
+        self.surface.fill('black')
+        pygame.draw.rect(self.surface, 'White', self.bar, 2, 3)
+        filled: pygame.Rect = self.bar.inflate(-8, -8)
+        filled.width = int(filled.width * done / max(1, total))
+        pygame.draw.rect(self.surface, 'White', filled)
+        text: pygame.Surface = assets.text(self.font_path, 30, f'loading {stage}', 'White')
+        self.surface.blit(text, text.get_rect(midbottom=(self.bar.centerx, self.bar.top - 10)))
+        pygame.display.update()
+
+def asset_files() -> Tuple[List[str], List[str]]:
+    '''every image under graphics and every sound under audio but the music'''
+    def walk(folder: str, extensions: Tuple[str, ...]) -> List[str]:
+        return sorted(os.path.join(path, name) for path, _, names in os.walk(os.getcwd() + folder)
+                      for name in names if name.lower().endswith(extensions) and name != MUSIC)
+    return walk('/graphics', ('.png',)), walk('/audio', ('.wav', '.mp3', '.ogg'))
+
+def in_atlas(path: str) -> bool:
+    '''is an image one of the frames baked into the atlas'''
+    return os.path.relpath(path, os.getcwd() + '/graphics').split(os.sep)[0] in ATLAS_FOLDERS
+
+def read(path: str) -> bytes:
+    '''the bytes of a file'''
+    with open(path, 'rb') as file:
+        return file.read()
+
+def preload(report: StartupReport, screen: Optional[LoadingScreen] = None, workers: int = LOAD_WORKERS) -> None:
+    '''the frames from the atlas cache, or decoded on threads and baked into it, the other images decoded and the
+    sounds read on threads'''
+    with report.stage('scan'):
+        images, sounds = asset_files()
+        frames: List[str] = [path for path in images if in_atlas(path)]
+    with report.stage('atlas'):
+        baked: Optional[Dict[str, pygame.Surface]] = atlas.load(frames)
+    decode: List[str] = images if baked is None else [path for path in images if path not in baked]
+    total: int = len(decode) + len(sounds)
+
+    with report.stage('read and decode'):
+        decoded: Dict[str, pygame.Surface] = {}
+        data: Dict[str, bytes] = {}
+        with ThreadPoolExecutor(workers) as pool:
+            # pygame.image.load lets go of the GIL while it decodes
+            jobs: Dict[Future, Tuple[Dict, str]] = {pool.submit(pygame.image.load, path): (decoded, path)
+                                                    for path in decode}
+            jobs.update({pool.submit(read, path): (data, path) for path in sounds})
+            for done, job in enumerate(as_completed(jobs), 1):
+                found, path = jobs[job]
+                found[path] = job.result()
+                if screen:
+                    screen.draw('images and sounds', done, total)
+
+    if baked is None and frames:
+        with report.stage('bake'):
+            if screen:
+                screen.draw('atlas', 0, 1)
+            try:
+                atlas.bake({path: decoded[path] for path in frames})
+                baked = atlas.load(frames)
+            except OSError as error:
+                print(f'the asset cache could not be written: {error}', file=sys.stderr)
+
+    # surfaces are converted for the display and sounds made for the mixer on the main thread
+    with report.stage('convert'):
+        for done, path in enumerate(images, 1):
+            if baked is not None and path in baked:
+                assets.share(path, baked[path])
+            else:
+                assets.image(path, decoded=decoded[path])
+            if screen:
+                screen.draw('images', done, len(images))
+    with report.stage('sounds'):
+        for done, path in enumerate(sounds, 1):
+            assets.sound(path, data.pop(path))
+            if screen:
+                screen.draw('sounds', done, len(sounds))
+    with report.stage('map'):
+        if screen:
+            screen.draw('map', 0, 1)
+        assets.tmx(os.getcwd() + '/data/map.tmx')
@@ -0,0 +1,49 @@
+'''the module for pacing the game loop: a fixed simulation step and frames held to a rate'''
+import time
+from src.settings import SIM_RATE, MAX_STEPS
+from typing import Callable
+
+# the last part of a wait is spun rather than slept, sleeping wakes up a little late
+SPIN: float = 0.0005
+
+class FixedStep:
+    '''the time frames took, handed out to the simulation in steps of the same length'''
+    def __init__(self, dt: float = 1 / SIM_RATE, max_steps: int = MAX_STEPS) -> None:
+        self.dt: float = dt
+        self.max_steps: int = max_steps
+        # time not yet simulated, always less than a step after advance
+        self.accumulator: float = 0.0
+
+    def advance(self, elapsed: float) -> int:
+        '''the steps to simulate for elapsed seconds; after a long hitch the game slows down instead of catching up'''
+        self.accumulator += elapsed
+        steps: int = int(self.accumulator / self.dt)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = steps * self.dt
+        self.accumulator -= steps * self.dt
+        return steps
+
+    def alpha(self) -> float:
+        '''how far the next step is, from 0 to 1, for drawing between the last two'''
+        return min(1.0, self.accumulator / self.dt)
+
+class FramePacer:
+    '''frames held to a rate by sleeping out the rest of each one, the way vsync holds them to the display'''
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self.clock: Callable[[], float] = clock
+        self.last: float = clock()
+
+    def wait(self, fps: int) -> float:
+        '''sleeping until a frame is due at fps, 0 for no limit, returning the seconds since the last frame'''
+        if fps:
+            due: float = self.last + 1 / fps
+            remaining: float = due - self.clock()
+            if remaining > SPIN:
+                time.sleep(remaining - SPIN)
+            while self.clock() < due:
+                pass
+        now: float = self.clock()
+        elapsed: float = now - self.last
+        self.last = now
+        return elapsed
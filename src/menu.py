@@ -2,17 +2,25 @@
 import os
 import pygame
 from src.settings import PURCHASE_PRICES, SALE_PRICES, SCREEN_HEIGHT, SCREEN_WIDTH
-from src.timerr import Timer
-from typing import List, Callable
+from src.timerr import Scheduler, Timer
+from typing import List, Callable, Optional, Tuple
 from src.player import Player
+from src.inputs import Keyboard
+from src.assets import assets
+
+# the colour of the panel between and around the entries, never drawn
+PANEL_KEY: Tuple[int, int, int] = (255, 0, 255)
 
 class Menu:
     '''menu class'''
-    def __init__(self, player: 'Player', toggle_menu: Callable) -> None:
+    def __init__(self, player: 'Player', toggle_menu: Callable, scheduler: Scheduler,
+                 controls: Optional[Keyboard] = None) -> None:
         self.player: 'Player' = player
         self.toggle_menu: Callable = toggle_menu
+        self.controls: Keyboard = controls or Keyboard()
         self.display_surface: pygame.Surface = pygame.display.get_surface()
-        self.font: pygame.font.Font = pygame.font.Font(os.getcwd() + '/font/LycheeSoda.ttf', 30)
+        self.font_path: str = os.getcwd() + '/font/LycheeSoda.ttf'
+        self.font_size: int = 30
 
         # options
         self.width: int = 400
@@ -22,27 +30,41 @@ class Menu:
         # entries
         self.options: List[str] = list(self.player.item_inventory.keys()) + list(self.player.seed_inventory.keys())
         self.sell_border: int = len(self.player.item_inventory) - 1
+        # the money the label shows, None until it is drawn
+        self.money_shown: Optional[int] = None
         self.setup()
 
         # movement
         self.index: int = 0
-        self.timer: Timer = Timer(200)
+        self.timer: Timer = Timer(200, scheduler)
 
 
     def display_money(self) -> None:
         '''displaying the money'''
-        text_surf: pygame.Surface = self.font.render(f'${self.player.money}', False, 'Black')
+        self.display_surface.blit(self.money_surf, self.money_rect)
+
+    def render_money(self) -> List[pygame.Rect]:
+        '''drawing the money label again when the money changed, returning its old and new screen areas'''
+        if self.player.money == self.money_shown:
+            return []
+        old: List[pygame.Rect] = [self.money_rect] if self.money_shown is not None else []
+        self.money_shown = self.player.money
+        text_surf: pygame.Surface = assets.text(self.font_path, self.font_size, f'${self.player.money}')
         text_rect: pygame.Rect = text_surf.get_rect(midbottom = (SCREEN_WIDTH / 2, SCREEN_HEIGHT - 20))
-
-        pygame.draw.rect(self.display_surface, 'White', text_rect.inflate(10, 10), 0, 3)
-        self.display_surface.blit(text_surf, text_rect)
+        self.money_rect: pygame.Rect = text_rect.inflate(10, 10)
+        self.money_surf: pygame.Surface = pygame.Surface(self.money_rect.size).convert()
+        self.money_surf.fill(PANEL_KEY)
+        self.money_surf.set_colorkey(PANEL_KEY)
+        pygame.draw.rect(self.money_surf, 'White', self.money_surf.get_rect(), 0, 3)
+        self.money_surf.blit(text_surf, (5, 5))
+        return old + [self.money_rect]
 
     def setup(self) -> None:
         '''setting up'''
         self.text_surfs: List[pygame.Surface] = []
         self.total_height: int = 0
         for item in self.options:
-            text_surf: pygame.Surface = self.font.render(item, False, 'Black')
+            text_surf: pygame.Surface = assets.text(self.font_path, self.font_size, item)
             self.text_surfs.append(text_surf)
             self.total_height += text_surf.get_height() + (self.padding * 2)
 
@@ -52,13 +74,18 @@ class Menu:
                             self.menu_top, self.width, self.total_height)
 
         # buy/sell
-        self.buy_text: pygame.Surface = self.font.render('Buy', False, 'Black')
-        self.sell_text: pygame.Surface = self.font.render('Sell', False, 'Black')
+        self.buy_text: pygame.Surface = assets.text(self.font_path, self.font_size, 'Buy')
+        self.sell_text: pygame.Surface = assets.text(self.font_path, self.font_size, 'Sell')
+
+        # the entries are drawn on a panel of their own, each again only when its amount or selection changes
+        self.panel: pygame.Surface = pygame.Surface(self.main_rect.size).convert()
+        self.panel.fill(PANEL_KEY)
+        self.panel.set_colorkey(PANEL_KEY, pygame.RLEACCEL)
+        self.shown: List[Optional[Tuple[int, bool]]] = [None] * len(self.options)
 
     def input(self) -> None:
         '''getting input from keyboard'''
-        keys = pygame.key.get_pressed()
-        self.timer.update()
+        keys = self.controls.get_pressed()
 
         if keys[pygame.K_ESCAPE]:
             self.toggle_menu()
@@ -77,14 +104,9 @@ class Menu:
 
                 current_item: str = self.options[self.index]
                 if self.index <= self.sell_border:
-                    if self.player.item_inventory[current_item] > 0:
-                        self.player.item_inventory[current_item] -= 1
-                        self.player.money += SALE_PRICES[current_item]
+                    self.sell(current_item)
                 else:
-                    seed_price: int = PURCHASE_PRICES[current_item]
-                    if self.player.money >= seed_price:
-                        self.player.seed_inventory[current_item] += 1
-                        self.player.money -= PURCHASE_PRICES[current_item]
+                    self.buy(current_item)
 
 
         # clamping values
@@ -93,38 +115,61 @@ class Menu:
         if self.index >= len(self.options):
             self.index = 0
 
+    def sell(self, item: str) -> bool:
+        '''selling one of an item, if the player has it'''
+        if self.player.item_inventory[item] > 0:
+            self.player.item_inventory[item] -= 1
+            self.player.money += SALE_PRICES[item]
+            return True
+        return False
+
+    def buy(self, seed: str) -> bool:
+        '''buying one seed, if the player can pay for it'''
+        seed_price: int = PURCHASE_PRICES[seed]
+        if self.player.money >= seed_price:
+            self.player.seed_inventory[seed] += 1
+            self.player.money -= seed_price
+            return True
+        return False
+
     def show_entry(self, text_surf: pygame.Surface, amount: int, top: float, selected: bool) -> None:
-        '''showing the menu'''
+        '''drawing an entry on the panel'''
         # background
-        bg_rect: pygame.Rect = pygame.Rect(self.main_rect.left, top, self.width, text_surf.get_height()
-                                          + self.padding * 2)
-        pygame.draw.rect(self.display_surface, 'White', bg_rect, 0, 3)
+        bg_rect: pygame.Rect = pygame.Rect(0, top, self.width, text_surf.get_height() + self.padding * 2)
+        self.panel.fill(PANEL_KEY, bg_rect)
+        pygame.draw.rect(self.panel, 'White', bg_rect, 0, 3)
         # text
-        text_rect: pygame.Rect = text_surf.get_rect(midleft = (self.main_rect.left + 20, bg_rect.centery))
-        self.display_surface.blit(text_surf, text_rect)
+        text_rect: pygame.Rect = text_surf.get_rect(midleft = (20, bg_rect.centery))
+        self.panel.blit(text_surf, text_rect)
         # amount
-        amount_surf: pygame.Surface = self.font.render(str(amount), False, 'Black')
-        amount_rect: pygame.Rect = amount_surf.get_rect(midright = (self.main_rect.right - 20, bg_rect.centery))
-        self.display_surface.blit(amount_surf, amount_rect)
+        amount_surf: pygame.Surface = assets.text(self.font_path, self.font_size, str(amount))
+        amount_rect: pygame.Rect = amount_surf.get_rect(midright = (self.width - 20, bg_rect.centery))
+        self.panel.blit(amount_surf, amount_rect)
         # selected
         if selected:
-            pygame.draw.rect(self.display_surface, 'Black', bg_rect, 3, 3)
+            pygame.draw.rect(self.panel, 'Black', bg_rect, 3, 3)
             if self.index <= self.sell_border: # sell
-                sell_rect: pygame.Rect = self.sell_text.get_rect(midleft = (self.main_rect.left + 150,
-                                                            bg_rect.centery))
-                self.display_surface.blit(self.sell_text, sell_rect)
+                sell_rect: pygame.Rect = self.sell_text.get_rect(midleft = (150, bg_rect.centery))
+                self.panel.blit(self.sell_text, sell_rect)
             else: # buy
-                buy_rect: pygame.Rect = self.buy_text.get_rect(midleft = (self.main_rect.left
-                                                            + 150, bg_rect.centery))
-                self.display_surface.blit(self.buy_text, buy_rect)
-
-    def update(self) -> None:
-        '''updating'''
-        self.input()
+                buy_rect: pygame.Rect = self.buy_text.get_rect(midleft = (150, bg_rect.centery))
+                self.panel.blit(self.buy_text, buy_rect)
+
+    def refresh(self) -> List[pygame.Rect]:
+        '''drawing again the entries and money that changed, returning their screen areas'''
+        changed: List[pygame.Rect] = self.render_money()
+        amounts: List[int] = list(self.player.item_inventory.values()) + list(self.player.seed_inventory.values())
+        for text_index, text_surf in enumerate(self.text_surfs):
+            amount, selected = amounts[text_index], self.index == text_index
+            if (amount, selected) != self.shown[text_index]:
+                self.shown[text_index] = (amount, selected)
+                top: float = text_index * (text_surf.get_height() + (self.padding * 2) + self.space)
+                self.show_entry(text_surf, amount, top, selected)
+                changed.append(pygame.Rect(self.main_rect.left, self.main_rect.top + top, self.width,
+                                           text_surf.get_height() + self.padding * 2))
+        return changed
+
+    def draw(self) -> None:
+        '''showing the money and the entries'''
         self.display_money()
-        for text_index,  text_surf in enumerate(self.text_surfs):
-            top: float = self.main_rect.top + text_index * (text_surf.get_height() +
-                                                    (self.padding * 2) + self.space)
-            amount_list: List[int] = list(self.player.item_inventory.values()) + list(self.player.seed_inventory.values())
-            amount: int = amount_list[text_index]
-            self.show_entry(text_surf, amount, top, self.index == text_index)
+        self.display_surface.blit(self.panel, self.main_rect)
@@ -3,6 +3,8 @@ import os
 import pygame
 from src.settings import OVERLAY_POSITIONS
 from src.player import Player
+from src.assets import assets
+from typing import List, Optional, Tuple
 
 class Overlay:
     '''Overlay class'''
@@ -13,8 +15,21 @@ class Overlay:
 
         # imports
         overlay_path: str = os.getcwd() + '/graphics/overlay/'
-        self.tools_surf: dict[str, pygame.Surface] = {tool: pygame.image.load(f'{overlay_path}{tool}.png').convert_alpha() for tool in player.tools}
-        self.seeds_surf: dict[str, pygame.Surface] = {seed: pygame.image.load(f'{overlay_path}{seed}.png').convert_alpha() for seed in player.seeds}
+        self.tools_surf: dict[str, pygame.Surface] = {tool: assets.image(f'{overlay_path}{tool}.png') for tool in player.tools}
+        self.seeds_surf: dict[str, pygame.Surface] = {seed: assets.image(f'{overlay_path}{seed}.png') for seed in player.seeds}
+        self.shown: Optional[Tuple[str, str]] = None
+        self.rects: List[pygame.Rect] = []
+
+    def changed(self) -> List[pygame.Rect]:
+        '''the screen areas of the old and new icons when the tool or seed changed since the last call'''
+        shown: Tuple[str, str] = (self.player.selected_tool, self.player.selected_seed)
+        if shown == self.shown:
+            return []
+        self.shown = shown
+        old: List[pygame.Rect] = self.rects
+        self.rects = [self.tools_surf[shown[0]].get_rect(midbottom=OVERLAY_POSITIONS['tool']),
+                      self.seeds_surf[shown[1]].get_rect(midbottom=OVERLAY_POSITIONS['seed'])]
+        return old + self.rects
 
     def display(self) -> None:
         '''Display overlay'''
@@ -3,15 +3,19 @@ import os
 import pygame
 from src.settings import LAYERS, PLAYER_TOOL_OFFSET
 from src.support import import_folder
-from src.timerr import Timer
-from typing import Dict, List, Callable
+from src.assets import assets
+from src.timerr import Scheduler, Timer
+from typing import Dict, List, Callable, Optional
 from src.soil import SoilLayer
+from src.spatial import CollisionGroup
+from src.inputs import Keyboard
+from src.profiler import profiler
 
 class Player(pygame.sprite.Sprite):
     ''' Player class '''
-    def __init__(self, pos: tuple[int, int], group: pygame.sprite.Group, collision_sprites: pygame.sprite.Group, 
+    def __init__(self, pos: tuple[int, int], group: pygame.sprite.Group, collision_sprites: CollisionGroup, 
                  tree_sprites: pygame.sprite.Group, interaction: pygame.sprite.Group, soil_layer: SoilLayer, 
-                 toggle_shop: Callable[[], None]) -> None:
+                 toggle_shop: Callable[[], None], scheduler: Scheduler, controls: Optional[Keyboard] = None) -> None:
         super().__init__(group)
 
         self.import_assets()
@@ -25,17 +29,18 @@ class Player(pygame.sprite.Sprite):
         self.direction: pygame.math.Vector2 = pygame.math.Vector2()
         self.pos: pygame.math.Vector2 = pygame.math.Vector2(self.rect.center)
         self.speed: int = 300
+        self.moving: bool = True
 
         # coll
-        self.collision_sprites: pygame.sprite.Group = collision_sprites
+        self.collision_sprites: CollisionGroup = collision_sprites
         self.hitbox: pygame.Rect = self.rect.copy().inflate((-126, -70))
 
         # timers
         self.timers: Dict[str, Timer] = {
-            'tool use': Timer(350, self.use_tool),
-            'tool switch': Timer(200),
-            'seed use': Timer(350, self.use_seed),
-            'seed switch': Timer(200)
+            'tool use': Timer(350, scheduler, self.use_tool),
+            'tool switch': Timer(200, scheduler),
+            'seed use': Timer(350, scheduler, self.use_seed),
+            'seed switch': Timer(200, scheduler)
         }
 
         # tools
@@ -67,9 +72,10 @@ class Player(pygame.sprite.Sprite):
         self.sleep: bool = False
         self.soil_layer: SoilLayer = soil_layer
         self.toggle_shop: Callable[[], None] = toggle_shop
+        self.controls: Keyboard = controls or Keyboard()
 
         # sound
-        self.watering: pygame.mixer.Sound = pygame.mixer.Sound(os.getcwd() + '/audio/water.mp3')
+        self.watering: pygame.mixer.Sound = assets.sound(os.getcwd() + '/audio/water.mp3')
         self.watering.set_volume(0.1)
 
 
@@ -118,7 +124,7 @@ class Player(pygame.sprite.Sprite):
 
     def input(self) -> None:
         '''taking input from the keyboard'''
-        keys = pygame.key.get_pressed()
+        keys = self.controls.get_pressed()
 
         if not self.timers['tool use'].active and not self.sleep:
             if keys[pygame.K_UP]:
@@ -183,31 +189,25 @@ class Player(pygame.sprite.Sprite):
         if self.timers['tool use'].active:
             self.status = self.status.split('_')[0] + '_' + self.selected_tool
 
-    def update_timers(self) -> None:
-        '''updating timers'''
-        for timer in self.timers.values():
-            timer.update()
-
     def collision(self, direction: str) -> None:
         '''collision with objects'''
-        for sprite in self.collision_sprites.sprites():
-            if hasattr(sprite, 'hitbox'):
-                if sprite.hitbox.colliderect(self.hitbox):
-                    if direction == 'horizontal':
-                        if self.direction.x > 0:
-                            self.hitbox.right = sprite.hitbox.left
-                        if self.direction.x < 0:
-                            self.hitbox.left = sprite.hitbox.right
-                        self.rect.centerx = self.hitbox.centerx
-                        self.pos.x = self.hitbox.centerx
-
-                    if direction == 'vertical':
-                        if self.direction.y > 0:
-                            self.hitbox.bottom = sprite.hitbox.top
-                        if self.direction.y < 0:
-                            self.hitbox.top = sprite.hitbox.bottom
-                        self.rect.centery = self.hitbox.centery
-                        self.pos.y = self.hitbox.centery
+        for sprite in self.collision_sprites.near(self.hitbox):
+            if sprite.hitbox.colliderect(self.hitbox):
+                if direction == 'horizontal':
+                    if self.direction.x > 0:
+                        self.hitbox.right = sprite.hitbox.left
+                    if self.direction.x < 0:
+                        self.hitbox.left = sprite.hitbox.right
+                    self.rect.centerx = self.hitbox.centerx
+                    self.pos.x = self.hitbox.centerx
+
+                if direction == 'vertical':
+                    if self.direction.y > 0:
+                        self.hitbox.bottom = sprite.hitbox.top
+                    if self.direction.y < 0:
+                        self.hitbox.top = sprite.hitbox.bottom
+                    self.rect.centery = self.hitbox.centery
+                    self.pos.y = self.hitbox.centery
 
     def move(self, dt: float) -> None:
         '''moving the character'''
@@ -218,18 +218,19 @@ class Player(pygame.sprite.Sprite):
         self.pos.x += self.direction.x * self.speed * dt
         self.hitbox.centerx = round(self.pos.x)
         self.rect.centerx = self.hitbox.centerx
-        self.collision('horizontal')
+        with profiler.phase('update/player collision'):
+            self.collision('horizontal')
         #vertical
         self.pos.y += self.direction.y * self.speed * dt
         self.hitbox.centery = round(self.pos.y)
         self.rect.centery = self.hitbox.centery
-        self.collision('vertical')
+        with profiler.phase('update/player collision'):
+            self.collision('vertical')
 
     def update(self, dt: float) -> None:
         '''updating'''
         self.input()
         self.get_status()
-        self.update_timers()
         self.get_target_pos()
         self.move(dt)
         self.animate(dt)
@@ -0,0 +1,183 @@
+'''the module for timing the phases of a frame'''
+import os
+import csv
+import json
+from collections import deque
+from time import perf_counter
+import pygame
+from src.settings import SCREEN_HEIGHT
+from src.assets import assets
+from typing import Deque, Dict, List, Optional, Sequence
+
+# upper edges, in milliseconds, of the histogram buckets
+HISTOGRAM_EDGES: List[float] = [0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 33, 66, float('inf')]
+
+GRAPH_COLORS: List[str] = ['#e6194b', '#3cb44b', '#ffe119', '#4363d8', '#f58231', '#911eb4',
+                           '#46f0f0', '#f032e6', '#bcf60c', '#fabebe', '#008080', '#e6beff']
+
+def percentile(ordered: Sequence[float], share: float) -> float:
+    '''nearest-rank percentile of sorted values'''
+    rank: int = max(0, min(len(ordered) - 1, round(share * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+def frame_stats(times: Sequence[float]) -> Dict[str, float]:
+    '''summary of times in seconds, in milliseconds'''
+    ordered: List[float] = sorted(time * 1000 for time in times)
+    if not ordered:
+        return {'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    return {
+        'mean': sum(ordered) / len(ordered),
+        'p50': percentile(ordered, 0.5),
+        'p95': percentile(ordered, 0.95),
+        'p99': percentile(ordered, 0.99),
+        'max': ordered[-1]
+    }
+
+def histogram(times: Sequence[float]) -> List[int]:
+    '''how many times, in seconds, fall in each HISTOGRAM_EDGES bucket'''
+    counts: List[int] = [0] * len(HISTOGRAM_EDGES)
+    for time in times:
+        milliseconds: float = time * 1000
+        for index, edge in enumerate(HISTOGRAM_EDGES):
+            if milliseconds <= edge:
+                counts[index] += 1
+                break
+    return counts
+
+class Phase:
+    '''a reusable timer for one named phase'''
+    __slots__ = ('totals', 'name', 'start')
+
+    def __init__(self, totals: Dict[str, float], name: str) -> None:
+        self.totals: Dict[str, float] = totals
+        self.name: str = name
+        self.start: float = 0
+
+    def __enter__(self) -> 'Phase':
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.totals[self.name] = self.totals.get(self.name, 0) + perf_counter() - self.start
+
+class NoPhase:
+    '''the timer handed out while profiling is off'''
+    __slots__ = ()
+
+    def __enter__(self) -> 'NoPhase':
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        pass
+
+class FrameProfiler:
+    '''rolling per-phase frame timings with an on-screen graph'''
+    def __init__(self, history: int = 300) -> None:
+        self.history: int = history
+        self.enabled: bool = False
+        self.visible: bool = False
+        self.per_class: bool = False
+        self.frames: int = 0
+        self.samples: Dict[str, Deque[float]] = {}
+        self.current: Dict[str, float] = {}
+        self.phases: Dict[str, Phase] = {}
+        self.no_phase: NoPhase = NoPhase()
+        self.frame_start: float = perf_counter()
+        self.font: Optional[pygame.font.Font] = None
+
+    def enable(self, per_class: bool = False) -> None:
+        '''starting to collect timings'''
+        self.enabled = True
+        self.per_class = per_class
+        self.frame_start = perf_counter()
+
+    def toggle(self) -> None:
+        '''showing or hiding the graph, collecting while it shows'''
+        self.visible = not self.visible
+        self.enabled = self.visible or self.enabled
+        if self.enabled:
+            self.frame_start = perf_counter()
+
+    def phase(self, name: str) -> 'Phase | NoPhase':
+        '''a context manager timing one phase, nested phases are named parent/child'''
+        if not self.enabled:
+            return self.no_phase
+        phase: Optional[Phase] = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = Phase(self.current, name)
+        return phase
+
+    def update_by_class(self, group: pygame.sprite.Group, dt: float) -> None:
+        '''updating a group with the time of each sprite class kept apart'''
+        totals: Dict[str, float] = self.current
+        for sprite in group.sprites():
+            name: str = 'update/' + type(sprite).__name__
+            start: float = perf_counter()
+            sprite.update(dt)
+            totals[name] = totals.get(name, 0) + perf_counter() - start
+
+    def end_frame(self) -> None:
+        '''closing the frame, every known phase gets a sample'''
+        if not self.enabled:
+            return
+        now: float = perf_counter()
+        self.current['frame'] = now - self.frame_start
+        self.frame_start = now
+        for name in self.current.keys() - self.samples.keys():
+            self.samples[name] = deque([0.0] * min(self.frames, self.history), self.history)
+        for name, samples in self.samples.items():
+            samples.append(self.current.get(name, 0.0))
+        self.current.clear()
+        self.frames += 1
+
+    def report(self) -> Dict[str, Dict[str, object]]:
+        '''stats and histogram of every phase over the history'''
+        return {name: dict(frame_stats(samples), histogram=histogram(samples))
+                for name, samples in self.samples.items()}
+
+    def dump_json(self, path: str) -> None:
+        '''writing the report as json'''
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({'frames': self.frames, 'history': self.history, 'histogram_edges_ms': HISTOGRAM_EDGES[:-1],
+                       'phases': self.report()}, file, indent=2)
+
+    def dump_csv(self, path: str) -> None:
+        '''writing one row of milliseconds per phase for every frame in the history'''
+        names: List[str] = sorted(self.samples)
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(names)
+            for row in zip(*(self.samples[name] for name in names)):
+                writer.writerow([f'{value * 1000:.4f}' for value in row])
+
+    def draw(self, surface: pygame.Surface) -> None:
+        '''a stacked graph of the top level phases and the mean time of every phase'''
+        if not self.visible or not self.samples:
+            return
+        if self.font is None:
+            self.font = assets.font(os.getcwd() + '/font/LycheeSoda.ttf', 18)
+        frame: Deque[float] = self.samples['frame']
+        names: List[str] = [name for name in sorted(self.samples) if name != 'frame']
+        stacked: List[str] = [name for name in names if '/' not in name]
+
+        # bars of the last frames, 2px each, 3px per millisecond
+        graph: pygame.Rect = pygame.Rect(10, SCREEN_HEIGHT - 160, self.history * 2, 100)
+        panel: pygame.Surface = pygame.Surface((graph.width, graph.height + 20 * (len(names) + 1)), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for index in range(len(frame)):
+            bottom: float = graph.height
+            for color, name in zip(GRAPH_COLORS, stacked):
+                height: float = self.samples[name][index] * 3000
+                pygame.draw.rect(panel, color, (index * 2, bottom - height, 2, height))
+                bottom -= height
+        budget: float = graph.height - 1000 / 60 * 3
+        pygame.draw.line(panel, 'white', (0, budget), (graph.width, budget))
+
+        for line, name in enumerate(['frame'] + names):
+            label: str = GRAPH_COLORS[stacked.index(name)] if name in stacked[:len(GRAPH_COLORS)] else 'white'
+            mean: float = sum(self.samples[name]) / len(self.samples[name]) * 1000
+            text: pygame.Surface = self.font.render(f'{name}: {mean:.2f} ms', False, label)
+            panel.blit(text, (4, graph.height + 20 * line))
+        surface.blit(panel, (graph.left, graph.top - panel.get_height() + graph.height))
+
+profiler: FrameProfiler = FrameProfiler()
@@ -0,0 +1,206 @@
+'''the module for recording a session's keys and seed to a file and playing it back to the same game state'''
+import hashlib
+import random
+import struct
+import numpy as np
+from src.settings import REPLAY_CHECK_EVERY
+from src.inputs import KEYS, Keyboard, KeyState, Pressed, ScriptedKeys
+from src.savegame import capture
+from typing import TYPE_CHECKING, BinaryIO, Dict, List, Optional, Tuple
+if TYPE_CHECKING:
+    from src.level import Level
+
+MAGIC = b'FARMKEYS'
+VERSION = 1
+# magic, version, seconds a step, seed of the random module, rain forced on (1), off (0) or left to the seed (-1)
+# and how many key codes follow
+FILE_HEADER = struct.Struct('<8sIdQbB')
+KEY = struct.Struct('<i')
+# R, a run of steps with the same keys held as a bit per key
+RUN = struct.Struct('<cIH')
+# C, the digest of the game after a number of steps, and E, the same at the end of the session
+CHECK = struct.Struct('<cI16s')
+
+def digest(level: 'Level') -> bytes:
+    '''a hash of everything the simulation holds, equal only when two sessions played out the same'''
+    hasher = hashlib.blake2b(digest_size=16)
+    for name, array in sorted(capture(level).items()):
+        hasher.update(name.encode())
+        hasher.update(np.ascontiguousarray(array).tobytes())
+    for pool in (level.rain.floor, level.rain.drops):
+        for array in (pool.pos, pool.velocity, pool.lifetime, pool.frame_index):
+            hasher.update(array.tobytes())
+    player = level.player
+    hasher.update(repr((
+        player.status, player.frame_index, tuple(player.pos), tuple(player.direction), player.sleep,
+        [name for name, timer in player.timers.items() if timer.active], level.scheduler.now(), level.sky.time,
+        level.transition.color, level.shop_active, level.menu.index, random.getstate()
+    )).encode())
+    return hasher.digest()
+
+def mask(pressed: Pressed, keys: Tuple[int, ...] = KEYS) -> int:
+    '''the keys held down as a bit per key'''
+    return sum(1 << bit for bit, key in enumerate(keys) if pressed[key])
+
+def unmask(bits: int, keys: Tuple[int, ...] = KEYS) -> KeyState:
+    '''the keys held down in a bit per key'''
+    return KeyState(key for bit, key in enumerate(keys) if bits >> bit & 1)
+
+class Recording:
+    '''a played session: how long its steps were, its seed, the keys of every step and digests along the way'''
+    def __init__(self, dt: float, seed: int, raining: Optional[bool] = None, keys: Tuple[int, ...] = KEYS) -> None:
+        self.dt: float = dt
+        self.seed: int = seed
+        self.raining: Optional[bool] = raining
+        self.keys: Tuple[int, ...] = keys
+        # (steps, keys) runs, and digests by the number of steps played before them
+        self.runs: List[Tuple[int, int]] = []
+        self.checks: Dict[int, bytes] = {}
+        self.final: Optional[bytes] = None
+
+    @property
+    def steps(self) -> int:
+        '''how many steps were recorded'''
+        return sum(steps for steps, _ in self.runs)
+
+    def write_header(self, file: BinaryIO) -> None:
+        '''the header and the key codes'''
+        file.write(FILE_HEADER.pack(MAGIC, VERSION, self.dt, self.seed, -1 if self.raining is None else int(self.raining),
+                                    len(self.keys)))
+        for key in self.keys:
+            file.write(KEY.pack(key))
+
+    @classmethod
+    def read(cls, path: str) -> 'Recording':
+        '''a recording from its file; one the game did not get to finish has no final digest'''
+        with open(path, 'rb') as file:
+            buffer: bytes = file.read()
+        if len(buffer) < FILE_HEADER.size:
+            raise ValueError('recording too short')
+        magic, version, dt, seed, raining, count = FILE_HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError('not a recording')
+        if version != VERSION:
+            raise ValueError(f'recording version {version}, this game reads version {VERSION}')
+        offset: int = FILE_HEADER.size
+        keys: Tuple[int, ...] = tuple(KEY.unpack_from(buffer, offset + index * KEY.size)[0] for index in range(count))
+        recording: Recording = cls(dt, seed, None if raining < 0 else bool(raining), keys)
+
+        offset += count * KEY.size
+        steps: int = 0
+        while offset < len(buffer):
+            kind: bytes = buffer[offset:offset + 1]
+            record: struct.Struct = RUN if kind == b'R' else CHECK
+            if kind not in (b'R', b'C', b'E') or offset + record.size > len(buffer):
+                break
+            _, count, value = record.unpack_from(buffer, offset)
+            offset += record.size
+            if kind == b'R':
+                recording.runs.append((count, value))
+                steps += count
+            elif kind == b'C':
+                recording.checks[count] = value
+            elif count == steps:
+                recording.final = value
+        return recording
+
+class RecordingKeys(Keyboard):
+    '''the keys of another keyboard, held for a whole step and written to a recording with digests of the game'''
+    def __init__(self, path: str, recording: Recording, source: Optional[Keyboard] = None,
+                 check_every: int = REPLAY_CHECK_EVERY) -> None:
+        self.recording: Recording = recording
+        self.source: Keyboard = source or Keyboard()
+        self.check_every: int = check_every
+        self.file: BinaryIO = open(path, 'wb')
+        recording.write_header(self.file)
+        self.level: Optional['Level'] = None
+        self.pressed: KeyState = KeyState(())
+        self.bits: int = 0
+        self.run: int = 0
+        self.steps: int = 0
+
+    def watch(self, level: 'Level') -> None:
+        '''the level whose digests go into the recording'''
+        self.level = level
+        self.source.watch(level)
+
+    def get_pressed(self) -> KeyState:
+        '''the keys held down in the current step'''
+        return self.pressed
+
+    def advance(self) -> None:
+        '''reading the keys for the next step, and a digest of the game every so many steps'''
+        if self.level is not None and self.steps and self.steps % self.check_every == 0:
+            self.flush()
+            self.file.write(CHECK.pack(b'C', self.steps, digest(self.level)))
+        self.source.advance()
+        bits: int = mask(self.source.get_pressed(), self.recording.keys)
+        if bits != self.bits:
+            self.flush()
+            self.bits = bits
+            self.pressed = unmask(bits, self.recording.keys)
+        self.run += 1
+        self.steps += 1
+
+    def flush(self) -> None:
+        '''writing the run of steps with the same keys so far'''
+        if self.run:
+            self.file.write(RUN.pack(b'R', self.run, self.bits))
+            self.recording.runs.append((self.run, self.bits))
+            self.run = 0
+
+    def ended(self) -> bool:
+        '''when the keys come from a script, has it run out'''
+        return self.source.ended()
+
+    def close(self) -> None:
+        '''writing the last run and the digest of the game at the end'''
+        if self.file.closed:
+            return
+        self.source.close()
+        self.flush()
+        if self.level is not None:
+            self.recording.final = digest(self.level)
+            self.file.write(CHECK.pack(b'E', self.steps, self.recording.final))
+        self.file.close()
+
+class ReplayKeys(ScriptedKeys):
+    '''the keys of a recording played back step by step, checking the game against its digests'''
+    def __init__(self, recording: Recording) -> None:
+        super().__init__([], loop=False)
+        self.recording: Recording = recording
+        for steps, bits in recording.runs:
+            self.frames.extend([unmask(bits, recording.keys)] * steps)
+        self.level: Optional['Level'] = None
+        self.checked: int = 0
+        # the number of steps after which the game first looked different from the recording
+        self.diverged: Optional[int] = None
+
+    def watch(self, level: 'Level') -> None:
+        '''the level to check against the recording'''
+        self.level = level
+
+    def check(self, steps: int, expected: bytes) -> None:
+        '''comparing the game with a digest of the recording'''
+        if self.level is None:
+            return
+        self.checked += 1
+        if self.diverged is None and digest(self.level) != expected:
+            self.diverged = steps
+
+    def advance(self) -> None:
+        '''moving on to the next step, after checking the game when the recording has a digest of it'''
+        steps: int = self.index + 1
+        if steps in self.recording.checks:
+            self.check(steps, self.recording.checks[steps])
+        super().advance()
+
+    def close(self) -> None:
+        '''checking the game at the end of the recording'''
+        if self.index + 1 == self.recording.steps and self.recording.final is not None:
+            self.check(self.recording.steps, self.recording.final)
+
+    def report(self) -> Dict[str, object]:
+        '''how the playback compared with the recording'''
+        return {'steps': self.recording.steps, 'played': self.index + 1, 'seed': self.recording.seed,
+                'checked': self.checked, 'diverged_at': self.diverged}
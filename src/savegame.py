@@ -0,0 +1,281 @@
+'''the module for saving the farm to a versioned binary file and loading it back'''
+import os
+import json
+import math
+import mmap
+import struct
+import traceback
+import numpy as np
+import pygame
+from src.settings import CHUNK_SIZE, SAVE_FILE, SAVE_COMPACT_EVERY
+from src.sprites import TreeState
+from typing import TYPE_CHECKING, BinaryIO, Dict, List, Tuple, Union
+if TYPE_CHECKING:
+    from src.level import Level
+
+MAGIC = b'FARMSAVE'
+VERSION = 1
+# magic and version, then records up to the end of the file
+FILE_HEADER = struct.Struct('<8sI')
+# FULL or DIFF, and how many blocks follow
+RECORD_HEADER = struct.Struct('<4sI')
+# name, numpy dtype, number of dimensions and shape, then the data aligned to ALIGN bytes
+BLOCK_HEADER = struct.Struct('<8s4sB3x3Q')
+ALIGN = 16
+
+CROP_BLOCKS: List[str] = ['x', 'y', 'kind', 'age']
+TREE_BLOCKS: List[str] = ['trees', 'health', 'alive', 'apple_n', 'apples']
+
+# the blocks every record of each kind holds
+FULL_BLOCKS: List[str] = ['soil'] + CROP_BLOCKS + TREE_BLOCKS + ['meta']
+DIFF_BLOCKS: List[str] = ['chunks'] + FULL_BLOCKS
+
+Blocks = Dict[str, np.ndarray]
+Record = Tuple[bytes, Blocks]
+
+def write_record(file: BinaryIO, kind: bytes, blocks: Blocks) -> None:
+    '''one record of named arrays, each aligned so it can be viewed where it lies'''
+    file.write(RECORD_HEADER.pack(kind, len(blocks)))
+    for name, array in blocks.items():
+        array = np.ascontiguousarray(array)
+        shape: Tuple[int, ...] = array.shape + (0,) * (3 - array.ndim)
+        file.write(BLOCK_HEADER.pack(name.encode(), array.dtype.str.encode(), array.ndim, *shape))
+        file.write(b'\0' * (-file.tell() % ALIGN))
+        file.write(array.tobytes())
+
+def read_records(buffer: Union[bytes, mmap.mmap]) -> Tuple[List[Record], int]:
+    '''the records of a save as arrays viewing the buffer, and the bytes they cover; a record cut short ends the file'''
+    if len(buffer) < FILE_HEADER.size:
+        raise ValueError('save file too short')
+    magic, version = FILE_HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError('not a save file')
+    if version != VERSION:
+        raise ValueError(f'save file version {version}, this game reads version {VERSION}')
+
+    records: List[Record] = []
+    end: int = FILE_HEADER.size
+    while end + RECORD_HEADER.size <= len(buffer):
+        kind, count = RECORD_HEADER.unpack_from(buffer, end)
+        offset: int = end + RECORD_HEADER.size
+        blocks: Blocks = {}
+        for _ in range(count):
+            if offset + BLOCK_HEADER.size > len(buffer):
+                return records, end
+            name, dtype, ndim, *shape = BLOCK_HEADER.unpack_from(buffer, offset)
+            offset += BLOCK_HEADER.size
+            offset += -offset % ALIGN
+            try:
+                item: np.dtype = np.dtype(dtype.rstrip(b'\0').decode())
+            except (TypeError, UnicodeDecodeError) as error:
+                raise ValueError(f'save file block of unknown type {dtype!r}') from error
+            if item.hasobject or ndim > 3:
+                raise ValueError(f'save file block of type {item} in {ndim} dimensions')
+            size: int = math.prod(shape[:ndim])
+            if offset + size * item.itemsize > len(buffer):
+                return records, end
+            blocks[name.rstrip(b'\0').decode()] = np.frombuffer(buffer, item, size, offset).reshape(shape[:ndim])
+            offset += size * item.itemsize
+        records.append((kind, blocks))
+        end = offset
+    return records, end
+
+def chunk_ids(x: np.ndarray, y: np.ndarray, shape: Tuple[int, int]) -> np.ndarray:
+    '''the chunk of every cell as one number'''
+    return (y // CHUNK_SIZE) * math.ceil(shape[1] / CHUNK_SIZE) + x // CHUNK_SIZE
+
+def chunk_count(shape: Tuple[int, int]) -> int:
+    '''how many chunks a grid of cells spans'''
+    return math.ceil(shape[0] / CHUNK_SIZE) * math.ceil(shape[1] / CHUNK_SIZE)
+
+def crop_digests(blocks: Blocks) -> np.ndarray:
+    '''one hash per chunk of the crops in it, to find the chunks whose crops changed'''
+    ids: np.ndarray = chunk_ids(blocks['x'], blocks['y'], blocks['soil'].shape)
+    mixed: np.ndarray = (blocks['x'].astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+                         ^ blocks['y'].astype(np.uint64) * np.uint64(0xC2B2AE3D27D4EB4F)
+                         ^ blocks['kind'].astype(np.uint64) * np.uint64(0x165667B19E3779F9)
+                         ^ np.ascontiguousarray(blocks['age'], np.float64).view(np.uint64))
+    digests: np.ndarray = np.zeros(chunk_count(blocks['soil'].shape), np.uint64)
+    np.bitwise_xor.at(digests, ids, mixed)
+    return digests
+
+def soil_chunks(soil: np.ndarray) -> np.ndarray:
+    '''the soil padded to whole chunks, as (chunk row, chunk column, CHUNK_SIZE, CHUNK_SIZE) blocks'''
+    rows, cols = soil.shape
+    padded: np.ndarray = np.zeros((math.ceil(rows / CHUNK_SIZE) * CHUNK_SIZE, math.ceil(cols / CHUNK_SIZE) * CHUNK_SIZE),
+                                  soil.dtype)
+    padded[:rows, :cols] = soil
+    return padded.reshape(padded.shape[0] // CHUNK_SIZE, CHUNK_SIZE, -1, CHUNK_SIZE).swapaxes(1, 2)
+
+def capture(level: 'Level') -> Blocks:
+    '''the whole farm as arrays'''
+    crops = level.soil_layer.crops
+    count: int = len(crops)
+    blocks: Blocks = {'soil': level.soil_layer.grid.cells, 'x': crops.x[:count], 'y': crops.y[:count],
+                      'kind': crops.kind[:count], 'age': crops.age[:count]}
+
+    states: Dict[Tuple[float, float], TreeState] = dict(level.world.saved_trees)
+    states.update({pos: tree.save() for pos, tree in level.world.trees.items()})
+    positions: List[Tuple[float, float]] = sorted(states)
+    apples: List[List[Tuple[int, int]]] = [states[pos][2] or [] for pos in positions]
+    blocks['trees'] = np.array(positions, np.float64).reshape(-1, 2)
+    blocks['health'] = np.array([states[pos][0] for pos in positions], np.int32)
+    blocks['alive'] = np.array([states[pos][1] for pos in positions], np.uint8)
+    blocks['apple_n'] = np.array([-1 if states[pos][2] is None else len(offsets) for pos, offsets in zip(positions, apples)],
+                                 np.int32)
+    blocks['apples'] = np.array([offset for offsets in apples for offset in offsets], np.int32).reshape(-1, 2)
+
+    player = level.player
+    meta: Dict[str, object] = {
+        'crop_types': crops.types,
+        'raining': level.raining,
+        'pos': list(player.pos),
+        'item_inventory': player.item_inventory,
+        'seed_inventory': player.seed_inventory,
+        'money': player.money,
+        'tool_index': player.tool_index,
+        'seed_index': player.seed_index
+    }
+    blocks['meta'] = np.frombuffer(json.dumps(meta).encode(), np.uint8)
+    return blocks
+
+def diff_blocks(blocks: Blocks, dirty: np.ndarray) -> Blocks:
+    '''the soil and crops of some chunks, with the small blocks whole'''
+    shape: Tuple[int, int] = blocks['soil'].shape
+    columns: int = math.ceil(shape[1] / CHUNK_SIZE)
+    chunks: np.ndarray = np.stack([dirty % columns, dirty // columns], axis=1).astype(np.int32)
+    inside: np.ndarray = np.isin(chunk_ids(blocks['x'], blocks['y'], shape), dirty)
+    diff: Blocks = {'chunks': chunks, 'soil': soil_chunks(blocks['soil'])[chunks[:, 1], chunks[:, 0]]}
+    diff.update({name: blocks[name][inside] for name in CROP_BLOCKS})
+    diff.update({name: blocks[name] for name in TREE_BLOCKS + ['meta']})
+    return diff
+
+def merge(state: Blocks, diff: Blocks) -> None:
+    '''applying a diff record to a whole farm'''
+    soil: np.ndarray = state['soil']
+    for (column, row), block in zip(diff['chunks'], diff['soil']):
+        area: np.ndarray = soil[row * CHUNK_SIZE:(row + 1) * CHUNK_SIZE, column * CHUNK_SIZE:(column + 1) * CHUNK_SIZE]
+        area[...] = block[:area.shape[0], :area.shape[1]]
+    dirty: np.ndarray = chunk_ids(diff['chunks'][:, 0] * CHUNK_SIZE, diff['chunks'][:, 1] * CHUNK_SIZE, soil.shape)
+    keep: np.ndarray = ~np.isin(chunk_ids(state['x'], state['y'], soil.shape), dirty)
+    for name in CROP_BLOCKS:
+        state[name] = np.concatenate([state[name][keep], diff[name]])
+    for name in TREE_BLOCKS + ['meta']:
+        state[name] = diff[name].copy()
+
+def read(path: str) -> Tuple[Blocks, int, int]:
+    '''the farm in a save file, how many diffs it had and how many bytes were whole'''
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        try:
+            records, end = read_records(buffer)
+        except ValueError as error:
+            # the frames the error passed through hold views that would keep the map from closing
+            traceback.clear_frames(error.__traceback__)
+            raise
+        # copies, nothing may view the map once it closes
+        records = [(kind, {name: array.copy() for name, array in blocks.items()}) for kind, blocks in records]
+    if not records or records[0][0] != b'FULL':
+        raise ValueError('save file does not start with a full record')
+    for kind, blocks in records:
+        missing: List[str] = [name for name in (FULL_BLOCKS if kind == b'FULL' else DIFF_BLOCKS) if name not in blocks]
+        if missing:
+            raise ValueError(f'save file {kind.decode(errors="replace")} record without {", ".join(missing)}')
+    state: Blocks = records[0][1]
+    try:
+        for _, diff in records[1:]:
+            merge(state, diff)
+    except (IndexError, TypeError) as error:
+        raise ValueError(f'save file diff does not fit the farm: {error}') from error
+    return state, len(records) - 1, end
+
+def restore(level: 'Level', blocks: Blocks) -> None:
+    '''bringing a level to a saved farm'''
+    soil_layer, world, player = level.soil_layer, level.world, level.player
+    if blocks['soil'].shape != soil_layer.grid.shape:
+        raise ValueError('the save file is for another map')
+    meta: dict = json.loads(blocks['meta'].tobytes())
+
+    for key in list(world.loaded):
+        world.unload(key)
+    soil_layer.grid.cells[...] = blocks['soil']
+    kinds: np.ndarray = np.array([soil_layer.crops.types.index(plant_type) for plant_type in meta['crop_types']], np.uint8)
+    soil_layer.crops.assign(blocks['x'], blocks['y'], kinds[blocks['kind']], blocks['age'])
+
+    apples: List[Tuple[int, int]] = [(int(x), int(y)) for x, y in blocks['apples']]
+    world.saved_trees = {}
+    start: int = 0
+    for (x, y), health, alive, count in zip(blocks['trees'], blocks['health'], blocks['alive'], blocks['apple_n']):
+        world.saved_trees[(float(x), float(y))] = (int(health), bool(alive), None if count < 0 else apples[start:start + count])
+        start += max(0, count)
+
+    player.pos = pygame.math.Vector2(meta['pos'])
+    player.hitbox.center = (round(player.pos.x), round(player.pos.y))
+    player.rect.center = player.hitbox.center
+    player.item_inventory.update(meta['item_inventory'])
+    player.seed_inventory.update(meta['seed_inventory'])
+    player.money = meta['money']
+    player.tool_index, player.seed_index = meta['tool_index'], meta['seed_index']
+    player.selected_tool = player.tools[player.tool_index]
+    player.selected_seed = player.seeds[player.seed_index]
+    level.raining = soil_layer.raining = meta['raining']
+
+    world.centre = None
+    world.stream(player.rect.center)
+
+class SaveFile:
+    '''a save written whole, then with the changed chunks appended every night until it is compacted'''
+    def __init__(self, path: str = SAVE_FILE, compact_every: int = SAVE_COMPACT_EVERY) -> None:
+        self.path: str = path
+        self.compact_every: int = compact_every
+        self.diffs: int = 0
+        # bytes of whole records in the file, and the soil and crop hashes they hold
+        self.length: int = 0
+        self.soil: np.ndarray = np.zeros((0, 0), np.uint8)
+        self.digests: np.ndarray = np.zeros(0, np.uint64)
+
+    def exists(self) -> bool:
+        '''is there a save to load'''
+        return os.path.exists(self.path)
+
+    def save(self, level: 'Level') -> None:
+        '''saving the chunks that changed since the last save, or the whole farm when due'''
+        blocks: Blocks = capture(level)
+        if self.soil.shape != blocks['soil'].shape or self.diffs >= self.compact_every:
+            self.write_full(blocks)
+        else:
+            self.append_diff(blocks)
+        self.remember(blocks)
+
+    def write_full(self, blocks: Blocks) -> None:
+        '''the whole farm in a new file that replaces the old one'''
+        temp: str = self.path + '.tmp'
+        with open(temp, 'wb') as file:
+            file.write(FILE_HEADER.pack(MAGIC, VERSION))
+            write_record(file, b'FULL', blocks)
+            self.length = file.tell()
+        os.replace(temp, self.path)
+        self.diffs = 0
+
+    def append_diff(self, blocks: Blocks) -> None:
+        '''the chunks whose soil or crops changed, appended to the file'''
+        changed_soil: np.ndarray = (soil_chunks(blocks['soil']) != soil_chunks(self.soil)).any(axis=(2, 3)).ravel()
+        changed_crops: np.ndarray = crop_digests(blocks) != self.digests
+        dirty: np.ndarray = np.flatnonzero(changed_soil | changed_crops)
+        with open(self.path, 'r+b') as file:
+            # a record a crash left half written is dropped
+            file.truncate(self.length)
+            file.seek(self.length)
+            write_record(file, b'DIFF', diff_blocks(blocks, dirty))
+            self.length = file.tell()
+        self.diffs += 1
+
+    def remember(self, blocks: Blocks) -> None:
+        '''keeping what the file holds to find the next changes'''
+        self.soil = blocks['soil'].copy()
+        self.digests = crop_digests(blocks)
+
+    def load(self, level: 'Level') -> None:
+        '''bringing a level to the farm in the file'''
+        state, self.diffs, self.length = read(self.path)
+        restore(level, state)
+        self.remember(state)
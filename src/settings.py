@@ -5,6 +5,45 @@ SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
 TILE_SIZE = 64
 
+# static layers are baked into chunks of CHUNK_SIZE x CHUNK_SIZE tiles
+CHUNK_SIZE = 16
+# chunks this far from the player's chunk are loaded, the ones one further are kept until the player walks away
+STREAM_RADIUS = 1
+
+# rendering - only the parts of the screen that changed are drawn and pushed, in at most DIRTY_MAX_RECTS
+# areas, the whole screen once they would cover more than DIRTY_FULL_SHARE of it; frames that would not
+# change are skipped and the game then waits for IDLE_FPS
+DIRTY_RECTS = True
+DIRTY_MAX_RECTS = 12
+DIRTY_FULL_SHARE = 0.5
+IDLE_FPS = 60
+
+# game loop - the game is simulated in steps of 1 / SIM_RATE seconds whatever the frame rate, at most MAX_STEPS
+# a frame, and drawn in between them; frames are held to MAX_FPS by sleeping, 0 draws as fast as possible;
+# without FIXED_STEP every frame is simulated with the time it took
+FIXED_STEP = True
+SIM_RATE = 60
+MAX_STEPS = 5
+MAX_FPS = 120
+
+# day and night - the sky darkens from DAY_COLOR towards NIGHT_COLOR by SKY_DARKEN_SPEED colour steps a second
+DAY_COLOR = (255, 255, 255)
+NIGHT_COLOR = (38, 101, 189)
+SKY_DARKEN_SPEED = 2
+# colour steps a second of the fade to black and back when going to bed
+TRANSITION_SPEED = 120
+
+# assets - bytes of decoded images and sounds kept cached before the least recently used go
+ASSET_BUDGET = 256 * 1024 * 1024
+# threads reading and decoding asset files at startup
+LOAD_WORKERS = 8
+# every image decoded once into atlas pages ATLAS_WIDTH wide, baked again when a source file changes
+ATLAS_FILE = 'assets.cache'
+ATLAS_WIDTH = 2048
+# only the small animation frames of these folders under graphics go into the atlas, the large single images like
+# the ground are decoded every time
+ATLAS_FOLDERS = ['character', 'soil', 'soil_water', 'water', 'fruit', 'rain']
+
 # overlay positions
 OVERLAY_POSITIONS = {
 	'tool' : (40, SCREEN_HEIGHT - 15), 
@@ -31,6 +70,18 @@ LAYERS = {
 	'rain drops': 10
 }
 
+# save file - written whole, then each night appends the chunks that changed, rewritten whole after this many nights
+SAVE_FILE = 'farm.save'
+SAVE_COMPACT_EVERY = 8
+
+# recordings - a digest of the game goes into a recording every REPLAY_CHECK_EVERY steps, to find where a playback
+# stopped matching it
+REPLAY_CHECK_EVERY = 600
+
+# rain - splashes and drops spawned per second, and how many of each can be alive at once
+RAIN_SPAWN_RATE = 120
+RAIN_POOL_SIZE = 128
+
 APPLE_POS = {
 	'Small': [(18,17), (30,37), (12,50), (30,45), (20,30), (30,10)],
 	'Large': [(30,24), (60,65), (50,50), (16,40),(45,50), (42,70)]
@@ -1,70 +1,141 @@
 '''the module for the sky and rain'''
 import os
-from random import randint, choice
+from random import getrandbits
+import numpy as np
 import pygame
-from src.settings import SCREEN_HEIGHT, SCREEN_WIDTH, LAYERS
+from pygame.surface import Surface
+from src.settings import (SCREEN_HEIGHT, SCREEN_WIDTH, LAYERS, RAIN_SPAWN_RATE, RAIN_POOL_SIZE, DAY_COLOR, NIGHT_COLOR,
+                          SKY_DARKEN_SPEED)
 from src.support import import_folder
-from src.sprites import Generic, Surface
-from src.level import CameraGroup
+from src.assets import assets
+from src.camera import CameraGroup
+from typing import List, Tuple
 
 
+class Tint:
+    '''a colour multiplied over the whole screen, its surface filled again only when the colour changes'''
+    def __init__(self) -> None:
+        self.color: Tuple[int, int, int] = (255, 255, 255)
+        self.surf: Surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.surf.fill(self.color)
+
+    def draw(self, surface: Surface, color: Tuple[int, int, int]) -> None:
+        '''darkening a surface by a colour, white leaves it as it is'''
+        if color == (255, 255, 255):
+            return
+        if color != self.color:
+            self.color = color
+            self.surf.fill(color)
+        surface.blit(self.surf, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
+
 class Sky:
     ''' class sky'''
     def __init__(self) -> None:
         self.display_surface = pygame.display.get_surface()
-        self.full_surf = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        self.start_color = [255, 255, 255]
-        self.end_color = (38, 101, 189)
+        # seconds since the morning, on the game's clock
+        self.time: float = 0.0
+        # the tint after every colour step of the day, from the morning to the night
+        steps: int = max(day - night for day, night in zip(DAY_COLOR, NIGHT_COLOR))
+        self.tints: List[Tuple[int, int, int]] = [
+            (max(NIGHT_COLOR[0], DAY_COLOR[0] - step), max(NIGHT_COLOR[1], DAY_COLOR[1] - step),
+             max(NIGHT_COLOR[2], DAY_COLOR[2] - step)) for step in range(steps + 1)]
+        self.tint: Tuple[int, int, int] = self.tints[0]
+        self.shade: Tint = Tint()
+
+    def morning(self) -> None:
+        '''starting a new day'''
+        self.time = 0.0
+        self.tint = self.tints[0]
 
-    def display(self, dt: float) -> None:
+    def update(self, dt: float) -> None:
+        '''darkening towards the evening'''
+        self.time += dt
+        self.tint = self.tints[min(int(self.time * SKY_DARKEN_SPEED), len(self.tints) - 1)]
+
+    def display(self) -> None:
         '''displaying'''
-        for index, value in enumerate(self.end_color):
-            if self.start_color[index] > value:
-                self.start_color[index] -= int(2 * dt)
-        self.full_surf.fill(self.start_color)
-        self.display_surface.blit(self.full_surf, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-
-class Drop(Generic):
-    ''' rain drops'''
-    # self, pos: tuple[int, int], surf: Surface, groups: list[Group], z: int
-    def __init__(self, surf: Surface, pos: tuple[int, int], moving: bool, groups: list[pygame.sprite.Group], z: int) -> None:
-        super().__init__(pos, surf, groups, z)
-        self.lifetime = randint(400, 500)
-        self.start_time = pygame.time.get_ticks()
-
-        # moving
+        self.shade.draw(self.display_surface, self.tint)
+
+class DropPool:
+    '''fixed-capacity rain particles kept in flat arrays'''
+    def __init__(self, frames: list[Surface], moving: bool, area: tuple[int, int],
+                 capacity: int = RAIN_POOL_SIZE, rate: float = RAIN_SPAWN_RATE) -> None:
+        self.frames = frames
+        self.heights = np.array([frame.get_height() for frame in frames])
+        self.max_size = np.array([max(frame.get_width() for frame in frames), self.heights.max()])
         self.moving = moving
+        self.area = area
+        self.rate = rate
+        # seeded from the random module so one random.seed() replays the rain too
+        self.rng = np.random.default_rng(getrandbits(64))
+
+        # particle columns, a slot is free once its lifetime has run out
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2), np.float64)
+        self.velocity = np.zeros((capacity, 2), np.float64)
+        self.lifetime = np.zeros(capacity, np.float64)
+        self.frame_index = np.zeros(capacity, np.intp)
+        self.cursor = 0
+        self.backlog = 0.0
+        # seconds the drawing lags behind the last update, drops are drawn back where they were then
+        self.lag = 0.0
+
+    def spawn(self, amount: int) -> None:
+        '''reusing the oldest slots for new particles'''
+        amount = min(amount, self.capacity)
+        slots = (self.cursor + np.arange(amount)) % self.capacity
+        self.cursor = int((self.cursor + amount) % self.capacity)
+        self.pos[slots, 0] = self.rng.integers(0, self.area[0], amount, endpoint=True)
+        self.pos[slots, 1] = self.rng.integers(0, self.area[1], amount, endpoint=True)
+        self.lifetime[slots] = self.rng.integers(400, 500, amount, endpoint=True) / 1000
+        self.frame_index[slots] = self.rng.integers(0, len(self.frames), amount)
         if self.moving:
-            self.pos = pygame.math.Vector2(self.rect.topleft)
-            self.direction = pygame.math.Vector2(-2, 4)
-            self.speed = randint(200, 250)
+            self.velocity[slots] = np.outer(self.rng.integers(200, 250, amount, endpoint=True), (-2, 4))
 
-    def update(self, dt: float) -> None:
-        '''updating'''
+    def update(self, dt: float, spawning: bool) -> None:
+        '''ageing, moving and spawning at a steady rate per second'''
+        self.lifetime -= dt
         if self.moving:
-            self.pos += self.direction * self.speed * dt
-            self.rect.topleft = (round(self.pos.x), round(self.pos.y))
+            self.pos += self.velocity * dt
+        if spawning:
+            self.backlog += self.rate * dt
+            if self.backlog >= 1:
+                self.spawn(int(self.backlog))
+                self.backlog -= int(self.backlog)
 
-        if pygame.time.get_ticks() - self.start_time >= self.lifetime:
-            self.kill()
+    def draw(self, surface: pygame.Surface, camera: pygame.Rect) -> None:
+        '''drawing the live particles under the camera in one batch'''
+        pos = self.pos - self.velocity * self.lag if self.moving and self.lag else self.pos
+        screen = np.rint(pos) - camera.topleft
+        shown = np.flatnonzero((self.lifetime > 0) & (screen > -self.max_size).all(axis=1)
+                               & (screen < camera.size).all(axis=1))
+        if not len(shown):
+            return
+        # y-sorted on the rect centre, like the sprites of the other layers
+        shown = shown[np.argsort(screen[shown, 1] + self.heights[self.frame_index[shown]] // 2, kind='stable')]
+        frames = self.frames
+        surface.blits([(frames[index], (x, y)) for index, (x, y)
+                       in zip(self.frame_index[shown].tolist(), screen[shown].astype(int).tolist())], False)
 
 class Rain:
     ''' rain class'''
     def __init__(self, all_sprites: CameraGroup) -> None:
         self.all_sprites = all_sprites
-        self.rain_drops = import_folder(os.getcwd() + '/graphics/rain/drops')
-        self.rain_floor = import_folder(os.getcwd() + '/graphics/rain/floor')
-        self.floor_w, self.floor_h = pygame.image.load(os.getcwd() + '/graphics/world/ground.png').get_size()
+        area = assets.image(os.getcwd() + '/graphics/world/ground.png').get_size()
+        self.floor = DropPool(import_folder(os.getcwd() + '/graphics/rain/floor'), False, area)
+        self.drops = DropPool(import_folder(os.getcwd() + '/graphics/rain/drops'), True, area)
+        self.all_sprites.add_batch(LAYERS['rain floor'], self.floor)
+        self.all_sprites.add_batch(LAYERS['rain drops'], self.drops)
 
-    def create_floor(self) -> None:
-        '''creating floor'''
-        Drop(choice(self.rain_floor), (randint(0, self.floor_w), randint(0, self.floor_h)), False, [self.all_sprites], LAYERS['rain floor'])
+    def update(self, dt: float, raining: bool = True) -> None:
+        '''updating'''
+        self.floor.update(dt, raining)
+        self.drops.update(dt, raining)
 
-    def create_drops(self) -> None:
-        '''creating rain drops'''
-        Drop(choice(self.rain_drops), (randint(0, self.floor_w), randint(0, self.floor_h)), True, [self.all_sprites], LAYERS['rain drops'])
+    def behind(self, lag: float) -> None:
+        '''drawing the drops lag seconds before where the last update left them'''
+        self.drops.lag = lag
 
-    def update(self) -> None: 
-        '''updating'''
-        self.create_floor()
-        self.create_drops()
+    def falling(self) -> bool:
+        '''are there drops left anywhere'''
+        return bool((self.floor.lifetime > 0).any() or (self.drops.lifetime > 0).any())
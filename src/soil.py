@@ -1,12 +1,21 @@
 import os
 from random import choice
 import pygame
-from src.settings import LAYERS, GROW_SPEED, TILE_SIZE
-from pytmx.util_pygame import load_pygame  # type:ignore
+from src.settings import LAYERS, TILE_SIZE, CHUNK_SIZE
 from src.support import import_folder, import_folder_dict
-from typing import List, Callable
+from src.assets import assets
+from src.camera import CameraGroup
+from src.spatial import CollisionGroup, restack
+from src.chunks import chunk_of
+from src.soil_grid import SoilGrid, FARMABLE, TILLED, WATERED, PLANTED
+from src.crops import Crops
+from typing import Dict, List, Optional, Set, Tuple
 
 
+# soil image for every TOP | RIGHT | BOTTOM | LEFT mask of tilled neighbours
+SOIL_TILE_TYPES: List[str] = ['o', 'b', 'l', 'bl', 't', 'tb', 'tl', 'tbr',
+                              'r', 'br', 'lr', 'lrb', 'tr', 'tbl', 'lrt', 'x']
+
 class SoilTile(pygame.sprite.Sprite):
     ''' solitiles'''
     def __init__(self, pos: tuple[int, int], surf: pygame.Surface, groups: List[pygame.sprite.Group]):
@@ -26,173 +35,226 @@ class WaterTile(pygame.sprite.Sprite):
 
 
 class Plant(pygame.sprite.Sprite):
-    '''plants'''
-    def __init__(self, plant_type: str, groups: List[pygame.sprite.Group], soil: SoilTile, check_watered:  Callable[[pygame.math.Vector2], bool]):
+    '''plants, drawn at the age kept for their cell in the crop columns'''
+    def __init__(self, plant_type: str, groups: List[pygame.sprite.Group], soil: SoilTile, age: float = 0):
         super().__init__(*groups)
         self.plant_type: str = plant_type
         self.frames: List[pygame.Surface] = import_folder(os.getcwd() + f'/graphics/fruit/{plant_type}')
         self.soil: SoilTile = soil
-        self.check_watered: Callable[[pygame.math.Vector2], bool] = check_watered
-        self.age: float = 0
         self.max_age: int = len(self.frames) - 1
-        self.grow_speed: float = GROW_SPEED[plant_type]
         self.harvestable: bool = False
-        self.image: pygame.Surface = self.frames[self.age]
         self.y_offset: int = -16 if plant_type == 'corn' else -8
-        self.rect: pygame.Rect = self.image.get_rect(midbottom=self.soil.rect.midbottom + pygame.math.Vector2(0, self.y_offset))
         self.z: int = LAYERS['ground plant']
+        self.show(age)
 
-    def grow(self) -> None:
-        '''growing plants'''
-        if self.check_watered(pygame.math.Vector2(self.rect.center[0], self.rect.center[1])):
-            self.age += self.grow_speed
-
-            if int(self.age) > 0:
-                self.z = LAYERS['main']
-                self.hitbox = self.rect.copy().inflate(-26, -self.rect.height * 0.4)
-            if self.age >= self.max_age:
-                self.age = self.max_age
-                self.harvestable = True
-
-            self.image = self.frames[int(self.age)]
-            self.rect = self.image.get_rect(midbottom=self.soil.rect.midbottom + pygame.math.Vector2(0, self.y_offset))
+    def show(self, age: float) -> None:
+        '''matching the image, layer, hitbox and harvestability to an age'''
+        self.age: float = age
+        self.image: pygame.Surface = self.frames[int(age)]
+        self.rect: pygame.Rect = self.image.get_rect(midbottom=self.soil.rect.midbottom + pygame.math.Vector2(0, self.y_offset))
+        if int(age) > 0:
+            self.z = LAYERS['main']
+            self.hitbox: pygame.Rect = self.rect.copy().inflate(-26, -self.rect.height * 0.4)
+        self.harvestable = age >= self.max_age
 
 
 class SoilLayer:
     '''soillayer'''
-    def __init__(self, all_sprites: pygame.sprite.Group, collision_sprites: pygame.sprite.Group):
+    def __init__(self, all_sprites: CameraGroup, collision_sprites: CollisionGroup):
         # sprite groups
-        self.all_sprites: pygame.sprite.Group = all_sprites
-        self.collision_sprites: pygame.sprite.Group = collision_sprites
+        self.all_sprites: CameraGroup = all_sprites
+        self.collision_sprites: CollisionGroup = collision_sprites
         self.soil_sprites: pygame.sprite.Group = pygame.sprite.Group()
         self.water_sprites: pygame.sprite.Group = pygame.sprite.Group()
         self.plant_sprites: pygame.sprite.Group = pygame.sprite.Group()
+        # sprites by (x, y) tile
+        self.soil_tiles: Dict[Tuple[int, int], SoilTile] = {}
+        self.water_tiles: Dict[Tuple[int, int], WaterTile] = {}
+        self.plants: Dict[Tuple[int, int], Plant] = {}
+        # the chunks that have sprites, every chunk when none
+        self.active_chunks: Optional[Set[Tuple[int, int]]] = None
+        # type and age of every crop, loaded or not
+        self.crops: Crops = Crops()
         # graphics
         self.soil_surfs: dict[str, pygame.Surface] = import_folder_dict(os.getcwd() + '/graphics/soil/')
         self.water_surfs: List[pygame.Surface] = import_folder(os.getcwd() + '/graphics/soil_water/')
         self.create_soil_grid()
-        self.create_hit_rects()
         # sounds
-        self.hoe_sound: pygame.mixer.Sound = pygame.mixer.Sound(os.getcwd() + '/audio/hoe.wav')
+        self.hoe_sound: pygame.mixer.Sound = assets.sound(os.getcwd() + '/audio/hoe.wav')
         self.hoe_sound.set_volume(0.1)
-        self.plant_sound: pygame.mixer.Sound = pygame.mixer.Sound(os.getcwd() + '/audio/plant.wav')
+        self.plant_sound: pygame.mixer.Sound = assets.sound(os.getcwd() + '/audio/plant.wav')
         self.plant_sound.set_volume(0.2)
         self.raining = False
 
     def create_soil_grid(self) -> None:
         '''creating the soil grid'''
-        ground: pygame.Surface = pygame.image.load(os.getcwd() + '/graphics/world/ground.png')
+        ground: pygame.Surface = assets.image(os.getcwd() + '/graphics/world/ground.png')
         h_tiles: int = ground.get_width() // TILE_SIZE
         v_tiles: int = ground.get_height() // TILE_SIZE
-        self.grid: List[List[List[str]]] = [[[] for col in range(h_tiles)] for row in range(v_tiles)]
-        for x, y, _ in load_pygame(os.getcwd() + '/data/map.tmx').get_layer_by_name('Farmable').tiles():
-            self.grid[y][x].append('F')
-
-    def create_hit_rects(self) -> None:
-        '''creating hit rects'''
-        self.hit_rects: List[pygame.Rect] = []
-        for index_row, row in enumerate(self.grid):
-            for index_col, cell in enumerate(row):
-                if 'F' in cell:
-                    x: int = index_col * TILE_SIZE
-                    y: int = index_row * TILE_SIZE
-                    rect: pygame.Rect = pygame.Rect(x, y, TILE_SIZE, TILE_SIZE)
-                    self.hit_rects.append(rect)
+        self.grid: SoilGrid = SoilGrid(v_tiles, h_tiles)
+        for x, y, _ in assets.tmx(os.getcwd() + '/data/map.tmx').get_layer_by_name('Farmable').tiles():
+            self.grid.set(x, y, FARMABLE)
+
+    def is_active(self, x: int, y: int) -> bool:
+        '''is the chunk of a cell loaded'''
+        return self.active_chunks is None or chunk_of(x, y) in self.active_chunks
+
+    def load_chunk(self, chunk: Tuple[int, int]) -> None:
+        '''creating the soil, water and plant sprites of a chunk'''
+        if self.active_chunks is None:
+            self.active_chunks = set()
+        self.active_chunks.add(chunk)
+        area: Tuple[int, int, int, int] = (chunk[0] * CHUNK_SIZE, chunk[1] * CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE)
+        for x, y in self.grid.where(TILLED, area=area):
+            self.place_soil_tile(x, y, self.grid.neighbours(x, y, TILLED))
+        for x, y in self.grid.where(WATERED, area=area):
+            if (x, y) not in self.water_tiles:
+                self.add_water_tile(x, y)
+        for cell in self.grid.where(PLANTED, area=area):
+            if cell in self.crops and cell not in self.plants:
+                self.add_plant(cell)
+
+    def unload_chunk(self, chunk: Tuple[int, int]) -> None:
+        '''dropping the sprites of a chunk, its crops stay in the columns'''
+        if self.active_chunks is not None:
+            self.active_chunks.discard(chunk)
+        area: Tuple[int, int, int, int] = (chunk[0] * CHUNK_SIZE, chunk[1] * CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE)
+        for cell in self.grid.where(TILLED, area=area):
+            for sprites in (self.plants, self.water_tiles, self.soil_tiles):
+                sprite: Optional[pygame.sprite.Sprite] = sprites.pop(cell, None)
+                if sprite:
+                    sprite.kill()
+
+    def cell_at(self, pos: pygame.math.Vector2) -> Optional[Tuple[int, int]]:
+        '''the (x, y) tile under a world position, none when off the grid'''
+        x: int = int(pos[0] // TILE_SIZE)
+        y: int = int(pos[1] // TILE_SIZE)
+        return (x, y) if self.grid.in_bounds(x, y) else None
 
     def get_hit(self, point: pygame.math.Vector2) -> None:
         '''getting hit'''
-        for rect in self.hit_rects:
-            if rect.collidepoint(point):
-                self.hoe_sound.play()
-                x: int = rect.x // TILE_SIZE
-                y: int = rect.y // TILE_SIZE
-                if 'F' in self.grid[y][x]:
-                    self.grid[y][x].append('X')
-                    self.create_soil_tiles()
-                    if self.raining:
-                        self.water_all()
+        cell: Optional[Tuple[int, int]] = self.cell_at(point)
+        if cell and self.grid.has(*cell, FARMABLE):
+            self.hoe_sound.play()
+            if not self.grid.has(*cell, TILLED):
+                self.grid.set(*cell, TILLED)
+                self.retile(*cell)
+                if self.raining:
+                    self.water_all()
 
     def water(self, target_pos: pygame.math.Vector2) -> None:
         '''watering'''
-        for soil_sprite in self.soil_sprites.sprites():
-            if soil_sprite.rect.collidepoint(target_pos):
-                x: int = soil_sprite.rect.x // TILE_SIZE
-                y: int = soil_sprite.rect.y // TILE_SIZE
-                self.grid[y][x].append('W')
+        cell: Optional[Tuple[int, int]] = self.cell_at(target_pos)
+        if cell in self.soil_tiles and not self.grid.has(*cell, WATERED):
+            self.grid.set(*cell, WATERED)
+            self.add_water_tile(*cell)
 
-                pos: tuple[int, int] = soil_sprite.rect.topleft
-                surf: pygame.Surface = choice(self.water_surfs)
-                WaterTile(pos, surf, [self.all_sprites, self.water_sprites])
+    def add_water_tile(self, x: int, y: int) -> None:
+        '''a puddle sprite on a watered tile'''
+        surf: pygame.Surface = choice(self.water_surfs)
+        self.water_tiles[(x, y)] = WaterTile((x * TILE_SIZE, y * TILE_SIZE), surf, [self.all_sprites, self.water_sprites])
 
     def water_all(self) -> None:
         '''water all soil when rain'''
-        for index_row, row in enumerate(self.grid):
-            for index_col, cell in enumerate(row):
-                if 'X' in cell and 'W' not in cell:
-                    cell.append('W')
-                    x: int = index_col * TILE_SIZE
-                    y: int = index_row * TILE_SIZE
-                    WaterTile((x, y), choice(self.water_surfs), [self.all_sprites, self.water_sprites])
+        for x, y in self.grid.water_all():
+            if self.is_active(x, y):
+                self.add_water_tile(x, y)
 
     def check_watered(self, pos: pygame.math.Vector2) -> bool:
         ''' is it watered'''
         x: int = int(pos[0] // TILE_SIZE)
         y: int = int(pos[1] // TILE_SIZE)
-        cell: List[str] = self.grid[y][x]
-        is_watered: bool = 'W' in cell
+        is_watered: bool = self.grid.has(x, y, WATERED)
         return is_watered
 
     def remove_water(self) -> None:
         ''' when night - remove water'''
         for sprite in self.water_sprites.sprites():
             sprite.kill()
+        self.water_tiles.clear()
 
-        for row in self.grid:
-            for cell in row:
-                if 'W' in cell:
-                    cell.remove('W')
+        self.grid.dry()
 
     def plant_seed(self, target_pos: pygame.math.Vector2, seed: str) -> None:
         '''plant seed'''
-        for soil_sprite in self.soil_sprites.sprites():
-            if soil_sprite.rect.collidepoint(target_pos):
-                self.plant_sound.play()
-                x: int = soil_sprite.rect.x // TILE_SIZE
-                y: int = soil_sprite.rect.y // TILE_SIZE
-                if 'P' not in self.grid[y][x]:
-                    self.grid[y][x].append('P')
-                    Plant(seed, [self.all_sprites, self.plant_sprites, self.collision_sprites], soil_sprite, self.check_watered)
+        cell: Optional[Tuple[int, int]] = self.cell_at(target_pos)
+        if cell is None:
+            return
+        if cell in self.soil_tiles:
+            self.plant_sound.play()
+            if not self.grid.has(*cell, PLANTED):
+                self.grid.set(*cell, PLANTED)
+                self.crops.add(cell, seed)
+                self.add_plant(cell)
+
+    def add_plant(self, cell: Tuple[int, int]) -> None:
+        '''a sprite for the crop on a cell'''
+        self.plants[cell] = Plant(self.crops.plant_type(cell), [self.all_sprites, self.plant_sprites, self.collision_sprites],
+                                  self.soil_tiles[cell], self.crops.age_of(cell))
+
+    def remove_plant(self, plant: 'Plant') -> None:
+        '''taking a harvested plant off its tile'''
+        cell: Tuple[int, int] = (plant.soil.rect.x // TILE_SIZE, plant.soil.rect.y // TILE_SIZE)
+        if self.plants.get(cell) is plant:
+            del self.plants[cell]
+            self.crops.remove(cell)
+            self.grid.clear(*cell, PLANTED)
+        plant.kill()
+
+    def grow_plants(self) -> None:
+        '''one day of growth for every watered crop, in the columns only'''
+        self.crops.grow(self.grid.cells, WATERED)
+
+    def sync_plants(self) -> None:
+        '''showing the new frame on the sprites of the crops that reached one'''
+        for cell in self.crops.changed():
+            plant: Optional[Plant] = self.plants.get(cell)
+            if plant:
+                plant.show(self.crops.age_of(cell))
+                restack(plant)
 
     def update_plants(self) -> None:
         '''update'''
-        for plant in self.plant_sprites.sprites():
-            plant.grow()
+        self.grow_plants()
+        self.sync_plants()
+
+    def pass_night(self, raining: bool) -> None:
+        '''a night in the grid and crop columns only: growth, drying and maybe rain'''
+        self.grow_plants()
+        self.grid.dry()
+        if raining:
+            self.grid.rain()
+
+    def sync_water(self) -> None:
+        '''new puddle sprites on the loaded watered cells'''
+        for sprite in self.water_sprites.sprites():
+            sprite.kill()
+        self.water_tiles.clear()
+        for x, y in self.grid.where(WATERED):
+            if (x, y) in self.soil_tiles:
+                self.add_water_tile(x, y)
 
     def create_soil_tiles(self) -> None:
-        '''creating soil tiles'''
-        self.soil_sprites.empty()
-        for index_row, row in enumerate(self.grid):
-            for index_col, cell in enumerate(row):
-                if 'X' in cell:
-                    # tile options
-                    t: bool = 'X' in self.grid[index_row - 1][index_col]
-                    b: bool = 'X' in self.grid[index_row + 1][index_col]
-                    r: bool = 'X' in self.grid[index_row][index_col + 1]
-                    l: bool = 'X' in self.grid[index_row][index_col - 1]
-                    tile_type: str = 'o'
-                    if all((t, r, b, l)): tile_type = 'x'
-                    if l and not any((t, r, b)): tile_type = 'r'
-                    if r and not any((t, l, b)): tile_type = 'l'
-                    if r and l and not any((t, b)): tile_type = 'lr'
-                    if t and not any((l, r, b)): tile_type = 'b'
-                    if b and not any((l, r, t)): tile_type = 't'
-                    if t and b and not any((l, r)): tile_type = 'tb'
-                    if t and l and not any((r, b)): tile_type = 'br'
-                    if t and r and not any((l, b)): tile_type = 'bl'
-                    if b and l and not any((r, t)): tile_type = 'tr'
-                    if b and r and not any((l, t)): tile_type = 'tl'
-                    if all((t, b, r)) and not l: tile_type = 'tbr'
-                    if all((t, b, l)) and not r: tile_type = 'tbl'
-                    if all((t, l, r)) and not b: tile_type = 'lrb'
-                    if all((l, r, b)) and not t: tile_type = 'lrt'
-                    SoilTile((index_col * TILE_SIZE, index_row * TILE_SIZE), self.soil_surfs[tile_type], [self.all_sprites, self.soil_sprites])
+        '''creating soil tiles for the whole grid, reusing the ones that exist'''
+        masks = self.grid.neighbour_masks(TILLED)
+        tilled = {(x, y) for x, y in self.grid.where(TILLED) if self.is_active(x, y)}
+        for cell in [cell for cell in self.soil_tiles if cell not in tilled]:
+            self.soil_tiles.pop(cell).kill()
+        for x, y in tilled:
+            self.place_soil_tile(x, y, int(masks[y, x]))
+
+    def retile(self, x: int, y: int) -> None:
+        '''autotiling a tilled cell and its four neighbours'''
+        for cell_x, cell_y in ((x, y), (x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
+            if self.grid.in_bounds(cell_x, cell_y) and self.grid.has(cell_x, cell_y, TILLED) \
+                    and self.is_active(cell_x, cell_y):
+                self.place_soil_tile(cell_x, cell_y, self.grid.neighbours(cell_x, cell_y, TILLED))
+
+    def place_soil_tile(self, x: int, y: int, mask: int) -> None:
+        '''pointing the soil tile of a cell at the image for its neighbours'''
+        surf: pygame.Surface = self.soil_surfs[SOIL_TILE_TYPES[mask]]
+        tile: Optional[SoilTile] = self.soil_tiles.get((x, y))
+        if tile:
+            tile.image = surf
+        else:
+            self.soil_tiles[(x, y)] = SoilTile((x * TILE_SIZE, y * TILE_SIZE), surf, [self.all_sprites, self.soil_sprites])
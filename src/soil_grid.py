@@ -0,0 +1,94 @@
+'''the module for the soil grid stored as bit flags'''
+import numpy as np
+from typing import List, Optional
+
+# one bit per state a tile can be in
+FARMABLE = 1
+TILLED = 2
+WATERED = 4
+PLANTED = 8
+
+# neighbour bits of the autotiling masks
+TOP = 1
+RIGHT = 2
+BOTTOM = 4
+LEFT = 8
+
+class SoilGrid:
+    '''a 2-d uint8 array of soil flags'''
+    def __init__(self, rows: int, cols: int) -> None:
+        self.cells: np.ndarray = np.zeros((rows, cols), np.uint8)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        '''rows and columns'''
+        return self.cells.shape
+
+    def has(self, x: int, y: int, flag: int) -> bool:
+        '''is a flag set on a cell'''
+        return bool(self.cells[y, x] & flag)
+
+    def set(self, x: int, y: int, flag: int) -> None:
+        '''setting a flag on a cell'''
+        self.cells[y, x] |= flag
+
+    def clear(self, x: int, y: int, flag: int) -> None:
+        '''clearing a flag on a cell'''
+        self.cells[y, x] &= ~flag & 0xFF
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        '''is a cell on the grid'''
+        return 0 <= y < self.cells.shape[0] and 0 <= x < self.cells.shape[1]
+
+    def neighbours(self, x: int, y: int, flag: int) -> int:
+        '''TOP | RIGHT | BOTTOM | LEFT mask of the neighbours of a cell with a flag'''
+        rows, cols = self.cells.shape
+        cells: np.ndarray = self.cells
+        mask: int = 0
+        if y > 0 and cells[y - 1, x] & flag:
+            mask |= TOP
+        if x < cols - 1 and cells[y, x + 1] & flag:
+            mask |= RIGHT
+        if y < rows - 1 and cells[y + 1, x] & flag:
+            mask |= BOTTOM
+        if x > 0 and cells[y, x - 1] & flag:
+            mask |= LEFT
+        return mask
+
+    def neighbour_masks(self, flag: int) -> np.ndarray:
+        '''the neighbours mask of every cell at once'''
+        has: np.ndarray = ((self.cells & flag) != 0).astype(np.uint8)
+        masks: np.ndarray = np.zeros_like(self.cells)
+        masks[1:, :] |= has[:-1, :] * TOP
+        masks[:, :-1] |= has[:, 1:] * RIGHT
+        masks[:-1, :] |= has[1:, :] * BOTTOM
+        masks[:, 1:] |= has[:, :-1] * LEFT
+        return masks
+
+    def where(self, flag: int, without: int = 0,
+              area: Optional[tuple[int, int, int, int]] = None) -> List[tuple[int, int]]:
+        '''(x, y) of the cells with flag set and none of the without flags, only inside a (left, top, width, height) area if given'''
+        left, top = 0, 0
+        cells: np.ndarray = self.cells
+        if area:
+            left, top, width, height = area
+            cells = cells[top:top + height, left:left + width]
+        mask: np.ndarray = (cells & flag).astype(bool)
+        if without:
+            mask &= (cells & without) == 0
+        ys, xs = np.nonzero(mask)
+        return list(zip((xs + left).tolist(), (ys + top).tolist()))
+
+    def water_all(self) -> List[tuple[int, int]]:
+        '''watering every dry tilled cell, returning the (x, y) that got wet'''
+        wet: List[tuple[int, int]] = self.where(TILLED, without=WATERED)
+        self.rain()
+        return wet
+
+    def rain(self) -> None:
+        '''the watered flag on every tilled cell'''
+        self.cells[(self.cells & TILLED) != 0] |= WATERED
+
+    def dry(self) -> None:
+        '''the nightly dry-out of every cell'''
+        self.cells &= ~WATERED & 0xFF
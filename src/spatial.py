@@ -0,0 +1,143 @@
+'''the module for the uniform grid spatial index'''
+from itertools import count
+from operator import attrgetter
+import pygame
+from src.settings import TILE_SIZE
+from typing import Callable, Dict, Generic, Iterator, List, Optional, Protocol, Set, Tuple, TypeVar
+
+Span = Tuple[int, int, int, int]
+
+class Drawn(Protocol):
+    '''what the render queue needs of a sprite: an image drawn at a rect on a layer'''
+    image: pygame.Surface
+    rect: pygame.Rect
+    z: int
+
+class Solid(Protocol):
+    '''what the collision index needs of a sprite: its hitbox'''
+    hitbox: pygame.Rect
+
+# whatever a grid holds, found by the rect it gets from each
+Item = TypeVar('Item')
+
+def cell_span(rect: pygame.Rect, cell_size: int) -> Span:
+    '''first and last cell covered by a rect'''
+    return (rect.left // cell_size, rect.top // cell_size,
+            (rect.right - 1) // cell_size if rect.width else rect.left // cell_size,
+            (rect.bottom - 1) // cell_size if rect.height else rect.top // cell_size)
+
+class SpatialGrid(Generic[Item]):
+    '''sprites bucketed by the grid cells their rect overlaps'''
+    def __init__(self, cell_size: int, rect_of: Callable[[Item], pygame.Rect] = attrgetter('rect')) -> None:
+        self.cell_size: int = cell_size
+        self.rect_of: Callable[[Item], pygame.Rect] = rect_of
+        self.cells: Dict[Tuple[int, int], Set[Item]] = {}
+        self.spans: Dict[Item, Span] = {}
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def __contains__(self, sprite: Item) -> bool:
+        return sprite in self.spans
+
+    def span(self, rect: pygame.Rect) -> Span:
+        '''first and last cell covered by a rect'''
+        return cell_span(rect, self.cell_size)
+
+    @staticmethod
+    def cells_of(span: Span) -> Iterator[Tuple[int, int]]:
+        '''every cell inside a span'''
+        left, top, right, bottom = span
+        for y in range(top, bottom + 1):
+            for x in range(left, right + 1):
+                yield x, y
+
+    def insert(self, sprite: Item) -> None:
+        '''adding a sprite under its current rect'''
+        span: Span = self.span(self.rect_of(sprite))
+        self.spans[sprite] = span
+        for cell in self.cells_of(span):
+            self.cells.setdefault(cell, set()).add(sprite)
+
+    def remove(self, sprite: Item) -> None:
+        '''dropping a sprite from every cell it was in'''
+        span = self.spans.pop(sprite, None)
+        if span is None:
+            return
+        for cell in self.cells_of(span):
+            bucket: Set[Item] = self.cells[cell]
+            bucket.discard(sprite)
+            if not bucket:
+                del self.cells[cell]
+
+    def move(self, sprite: Item) -> bool:
+        '''re-binning a sprite whose rect changed, true if it changed cells'''
+        if self.spans.get(sprite) == self.span(self.rect_of(sprite)):
+            return False
+        self.remove(sprite)
+        self.insert(sprite)
+        return True
+
+    def query_span(self, span: Span) -> Set[Item]:
+        '''sprites in the cells of a span'''
+        found: Set[Item] = set()
+        cells = self.cells
+        for cell in self.cells_of(span):
+            bucket = cells.get(cell)
+            if bucket:
+                found |= bucket
+        return found
+
+    def query(self, rect: pygame.Rect) -> Set[Item]:
+        '''sprites whose cells overlap a rect'''
+        return self.query_span(self.span(rect))
+
+class CollisionGroup(pygame.sprite.Group):
+    '''sprite group with a broadphase index over the hitboxes'''
+    def __init__(self, cell_size: int = TILE_SIZE) -> None:
+        super().__init__()
+        self.grid: SpatialGrid[Solid] = SpatialGrid(cell_size, attrgetter('hitbox'))
+        # insertion tickets keep the collision response in group order
+        self.order: Dict[Solid, int] = {}
+        self.tickets: Iterator[int] = count()
+        # sprites are added before their hitbox exists, so they wait here until the next query
+        self.pending: List[Solid] = []
+
+    def add_internal(self, sprite: Solid, layer: None = None) -> None:
+        '''adding a sprite to the group and queueing it for the index'''
+        super().add_internal(sprite)
+        self.order[sprite] = next(self.tickets)
+        self.pending.append(sprite)
+
+    def remove_internal(self, sprite: Solid) -> None:
+        '''removing a sprite from the group and the index'''
+        super().remove_internal(sprite)
+        self.order.pop(sprite, None)
+        self.grid.remove(sprite)
+
+    def restack(self, sprite: Solid) -> None:
+        '''re-indexing a sprite whose hitbox changed'''
+        self.grid.remove(sprite)
+        self.pending.append(sprite)
+
+    def flush(self) -> None:
+        '''indexing the pending sprites that have a hitbox'''
+        for sprite in self.pending:
+            if sprite in self.spritedict and sprite not in self.grid and hasattr(sprite, 'hitbox'):
+                self.grid.insert(sprite)
+        self.pending.clear()
+
+    def near(self, rect: pygame.Rect) -> List[Solid]:
+        '''sprites whose hitbox may touch a rect, one cell of slack around it'''
+        if self.pending:
+            self.flush()
+        size: int = self.grid.cell_size
+        found: Set[Solid] = self.grid.query(rect.inflate(size * 2, size * 2))
+        return sorted(found, key=self.order.__getitem__)
+
+def restack(sprite: pygame.sprite.Sprite) -> None:
+    '''telling the indexed groups of a sprite that its rect, hitbox or z changed'''
+    for group in sprite.groups():
+        refresh: Optional[Callable[[pygame.sprite.Sprite], None]] = getattr(group, 'restack', None)
+        if refresh:
+            refresh(sprite)
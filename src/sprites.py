@@ -5,7 +5,13 @@ import pygame
 from pygame.surface import Surface
 from pygame.sprite import Group
 from src.settings import LAYERS, APPLE_POS
-from typing import Callable
+from src.spatial import restack
+from src.timerr import Scheduler
+from src.assets import assets
+from typing import Callable, List, Optional, Tuple
+
+# health, alive and apple offsets from the top left, no apples when they are rolled again on loading
+TreeState = Tuple[int, bool, Optional[List[Tuple[int, int]]]]
 
 class Generic(pygame.sprite.Sprite):
     '''the generic'''
@@ -25,6 +31,8 @@ class Interaction(Generic):
 
 class Water(Generic):
     '''one for the water'''
+    animation_speed: float = 5
+
     def __init__(self, pos: tuple[int, int], frames: list[Surface], groups: Group):
         self.frames: list[Surface] = frames
         self.frame_index: float = 0
@@ -32,7 +40,7 @@ class Water(Generic):
 
     def animate(self, dt: float) -> None:
         '''pseudo animating water'''
-        self.frame_index += 5 * dt
+        self.frame_index += self.animation_speed * dt
         if self.frame_index >= len(self.frames):
             self.frame_index = 0
         self.image = self.frames[int(self.frame_index)]
@@ -49,42 +57,40 @@ class Wildflower(Generic):
 
 class Particle(Generic):
     '''a particle effect'''
-    def __init__(self, pos: tuple[int, int], surf: Surface, groups: Group, z: int, duration: int = 200):
+    def __init__(self, pos: tuple[int, int], surf: Surface, groups: Group, z: int, scheduler: Scheduler,
+                 duration: int = 200):
         super().__init__(pos, surf, [groups], z)
-        self.start_time: int = pygame.time.get_ticks()
         self.duration: int = duration
+        # gone once the duration passed on the level's clock, without looking at the time every frame
+        scheduler.schedule(duration, self.kill)
 
         mask_surf: pygame.Mask = pygame.mask.from_surface(self.image)
         new_surf: Surface = mask_surf.to_surface()
         new_surf.set_colorkey((0, 0, 0))
         self.image = new_surf
 
-    def update(self, dt: float) -> None:
-        '''updating'''
-        current_time: int = pygame.time.get_ticks()
-        if current_time - self.start_time >= self.duration:
-            self.kill()
-
 class Tree(Generic):
     '''one for the trees'''
-    def __init__(self, pos: tuple[int, int], surf: Surface, groups: list[Group], name: str, player_add: Callable):
+    def __init__(self, pos: tuple[int, int], surf: Surface, groups: list[Group], name: str, player_add: Callable,
+                 scheduler: Scheduler):
         super().__init__(pos, surf, groups)
         self.all_sprites: Group = groups[0]
+        self.scheduler: Scheduler = scheduler
 
         # tree attributes
         self.health: int = 5
         self.is_alive: bool = True
         stump_path: str = os.getcwd() + f'/graphics/stumps/{"small" if name == "Small" else "large"}.png'
-        self.stump_surf: Surface = pygame.image.load(stump_path).convert_alpha()
+        self.stump_surf: Surface = assets.image(stump_path)
 
         # apples
-        self.apple_surf: Surface = pygame.image.load(os.getcwd() + '/graphics/fruit/apple.png').convert_alpha()
+        self.apple_surf: Surface = assets.image(os.getcwd() + '/graphics/fruit/apple.png')
         self.apple_pos: list[tuple[int, int]] = APPLE_POS[name]
         self.apple_sprites: Group = pygame.sprite.Group()
         self.create_fruit()
 
         self.player_add: Callable = player_add
-        self.axe_sound: pygame.mixer.Sound = pygame.mixer.Sound(os.getcwd() + '/audio/axe.mp3')
+        self.axe_sound: pygame.mixer.Sound = assets.sound(os.getcwd() + '/audio/axe.mp3')
 
     def damage(self) -> None:
         '''hitting a tree with an axe'''
@@ -92,20 +98,25 @@ class Tree(Generic):
         self.axe_sound.play()
         if len(self.apple_sprites.sprites()) > 0:
             random_apple = choice(self.apple_sprites.sprites())
-            Particle(random_apple.rect.topleft, random_apple.image, self.all_sprites, LAYERS['fruit'])
+            Particle(random_apple.rect.topleft, random_apple.image, self.all_sprites, LAYERS['fruit'], self.scheduler)
             self.player_add('apple')
             random_apple.kill()
 
     def check_death(self) -> None: 
         '''is it?'''
         if self.health <= 0:
-            Particle(self.rect.topleft, self.image, self.all_sprites, LAYERS['fruit'], 500)
-            self.image = self.stump_surf
-            self.rect = self.image.get_rect(midbottom=self.rect.midbottom)
-            self.hitbox = self.rect.copy().inflate(-10, -self.rect.height * 0.6)
-            self.is_alive = False
+            Particle(self.rect.topleft, self.image, self.all_sprites, LAYERS['fruit'], self.scheduler, 500)
+            self.become_stump()
             self.player_add('wood')
 
+    def become_stump(self) -> None:
+        '''swapping the tree for its stump'''
+        self.image = self.stump_surf
+        self.rect = self.image.get_rect(midbottom=self.rect.midbottom)
+        self.hitbox = self.rect.copy().inflate(-10, -self.rect.height * 0.6)
+        restack(self)
+        self.is_alive = False
+
     def update(self, dt: float) -> None:
         '''updating'''
         if self.is_alive:
@@ -115,10 +126,30 @@ class Tree(Generic):
         '''spawning apples'''
         for pos in self.apple_pos:
             if randint(0, 10) < 2:
-                x, y = pos[0] + self.rect.left, pos[1] + self.rect.top
-                Generic(
-                    pos=(x, y),
-                    surf=self.apple_surf,
-                    groups=[self.apple_sprites, self.all_sprites],
-                    z=LAYERS['fruit']
-                )
+                self.add_apple(pos)
+
+    def add_apple(self, pos: tuple[int, int]) -> None:
+        '''an apple at an offset from the top left of the tree'''
+        x, y = pos[0] + self.rect.left, pos[1] + self.rect.top
+        Generic(
+            pos=(x, y),
+            surf=self.apple_surf,
+            groups=[self.apple_sprites, self.all_sprites],
+            z=LAYERS['fruit']
+        )
+
+    def save(self) -> TreeState:
+        '''what is needed to build the tree again'''
+        return (self.health, self.is_alive,
+                [(apple.rect.left - self.rect.left, apple.rect.top - self.rect.top) for apple in self.apple_sprites])
+
+    def restore(self, state: TreeState) -> None:
+        '''bringing a new tree back to a saved state'''
+        self.health, is_alive, apples = state
+        if self.is_alive and not is_alive:
+            self.become_stump()
+        if apples is not None:
+            for apple in self.apple_sprites.sprites():
+                apple.kill()
+            for pos in apples:
+                self.add_apple(pos)
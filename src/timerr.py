@@ -1,29 +1,85 @@
 '''the module for having timers'''
-import pygame
-from typing import Callable, Optional
+import heapq
+import itertools
+from typing import Callable, Iterator, List, Optional, Tuple
+
+class Event:
+    '''a callback waiting in the scheduler, dropped when it is due if it was cancelled'''
+    __slots__ = ('due', 'callback')
+
+    def __init__(self, due: int, callback: Callable[[], None]) -> None:
+        self.due: int = due
+        self.callback: Optional[Callable[[], None]] = callback
+
+class Scheduler:
+    '''callbacks kept in a heap by the millisecond they are due, on a clock that moves only when the game steps'''
+    def __init__(self) -> None:
+        self.time: float = 0.0
+        self.queue: List[Tuple[int, int, Event]] = []
+        # keeps callbacks due on the same millisecond in the order they were scheduled
+        self.order: Iterator[int] = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    def now(self) -> int:
+        '''the milliseconds the game has run'''
+        return int(self.time * 1000)
+
+    def schedule(self, delay: int, callback: Callable[[], None]) -> Event:
+        '''calling callback once delay milliseconds have passed'''
+        event: Event = Event(self.now() + delay, callback)
+        heapq.heappush(self.queue, (event.due, next(self.order), event))
+        return event
+
+    def cancel(self, event: Event) -> None:
+        '''not calling the callback of an event after all'''
+        event.callback = None
+
+    def advance(self, dt: float) -> int:
+        '''moving the clock forward by dt seconds and calling whatever became due, returning how many were'''
+        self.time += dt
+        now: int = self.now()
+        fired: int = 0
+        while self.queue and self.queue[0][0] <= now:
+            event: Event = heapq.heappop(self.queue)[2]
+            callback: Optional[Callable[[], None]] = event.callback
+            if callback is not None:
+                event.callback = None
+                callback()
+                fired += 1
+        return fired
 
 class Timer:
     '''creating timer'''
-    def __init__(self, duration: int, func: Optional[Callable[[], None]] = None) -> None:
+    def __init__(self, duration: int, scheduler: Scheduler, func: Optional[Callable[[], None]] = None) -> None:
         self.duration: int = duration
         self.func: Optional[Callable[[], None]] = func
+        # the clock of the level the timer belongs to
+        self.scheduler: Scheduler = scheduler
+        self.event: Optional[Event] = None
         self.start_time: int = 0
         self.active: bool = False
 
     def activate(self) -> None:
         '''activating timer'''
+        if self.event is not None:
+            self.scheduler.cancel(self.event)
         self.active = True
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = self.scheduler.now()
+        self.event = self.scheduler.schedule(self.duration, self.expire)
 
     def deactive(self) -> None:
         '''deactivating timer'''
+        if self.event is not None:
+            self.scheduler.cancel(self.event)
+            self.event = None
         self.active = False
         self.start_time = 0
 
-    def update(self) -> None:
-        '''updating'''
-        current_time: int = pygame.time.get_ticks()
-        if current_time - self.start_time >= self.duration:
-            if self.func and self.start_time != 0:
-                self.func()
-            self.deactive()
+    def expire(self) -> None:
+        '''running out'''
+        self.event = None
+        if self.func:
+            self.func()
+        self.deactive()
@@ -1,6 +1,7 @@
 '''the module for the transition day/night'''
 import pygame
-from src.settings import SCREEN_WIDTH, SCREEN_HEIGHT
+from src.settings import TRANSITION_SPEED
+from src.sky import Tint
 from typing import Callable
 from src.player import Player
 
@@ -12,14 +13,14 @@ class Transition:
         self.reset: Callable[[], None] = reset
         self.player: Player = player
 
-        # overlay image
-        self.image: pygame.Surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        self.color: int = 255
-        self.speed: int = -2
+        # darkness
+        self.shade: Tint = Tint()
+        self.color: float = 255
+        self.speed: float = -TRANSITION_SPEED
 
-    def play(self) -> None:
-        '''the transition'''
-        self.color += self.speed
+    def play(self, dt: float) -> None:
+        '''the transition, fading out, resetting the day and fading back in'''
+        self.color += self.speed * dt
         if self.color <= 0:
             self.speed *= -1
             self.color = 0
@@ -27,7 +28,9 @@ class Transition:
         if self.color > 255:
             self.color = 255
             self.player.sleep = False
-            self.speed = -2
+            self.speed = -TRANSITION_SPEED
 
-        self.image.fill((self.color, self.color, self.color))
-        self.display_surface.blit(self.image, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+    def draw(self) -> None:
+        '''darkening the screen'''
+        color: int = int(self.color)
+        self.shade.draw(self.display_surface, (color, color, color))
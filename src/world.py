@@ -0,0 +1,180 @@
+'''the module for streaming the map in chunks around the player'''
+import os
+import math
+import pygame
+from pygame.surface import Surface
+from src.settings import TILE_SIZE, CHUNK_SIZE, LAYERS, STREAM_RADIUS
+from src.sprites import Generic, Water, Wildflower, Tree, TreeState
+from src.chunks import Chunk, AnimatedChunk, chunk_of, bake_tiles, bake_animated
+from src.camera import CameraGroup
+from src.spatial import CollisionGroup
+from src.soil import SoilLayer
+from src.support import import_folder
+from src.assets import assets
+from src.timerr import Scheduler
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+ChunkKey = Tuple[int, int]
+Tile = Tuple[int, int, Surface]
+MapObject = Tuple[Tuple[int, int], Surface, str]
+
+def chunk_tiles(tmx_data: Any, layer: str, key: ChunkKey) -> Iterator[Tile]:
+    '''the tiles of a layer inside one chunk, row by row like the layer's own tiles()'''
+    data: List[List[int]] = tmx_data.get_layer_by_name(layer).data
+    left, top = key[0] * CHUNK_SIZE, key[1] * CHUNK_SIZE
+    for y in range(top, min(top + CHUNK_SIZE, len(data))):
+        row: List[int] = data[y]
+        for x in range(left, min(left + CHUNK_SIZE, len(row))):
+            if row[x]:
+                yield x, y, tmx_data.images[row[x]]
+
+class WorldChunk:
+    '''the tiles and objects of the map in one chunk'''
+    __slots__ = ('house_bottom', 'house_top', 'fence', 'water', 'collision', 'trees', 'flowers')
+
+    def __init__(self) -> None:
+        self.house_bottom: List[Tile] = []
+        self.house_top: List[Tile] = []
+        self.fence: List[Tile] = []
+        self.water: List[Tuple[int, int]] = []
+        self.collision: List[Tuple[int, int]] = []
+        self.trees: List[MapObject] = []
+        self.flowers: List[MapObject] = []
+
+class World:
+    '''the map indexed by chunk, with sprites only for the chunks around the player'''
+    def __init__(self, tmx_data: Any, all_sprites: CameraGroup, collision_sprites: CollisionGroup,
+                 tree_sprites: pygame.sprite.Group, soil_layer: SoilLayer, player_add: Callable[[str], None],
+                 scheduler: Scheduler, radius: int = STREAM_RADIUS) -> None:
+        self.all_sprites: CameraGroup = all_sprites
+        self.collision_sprites: CollisionGroup = collision_sprites
+        self.tree_sprites: pygame.sprite.Group = tree_sprites
+        self.soil_layer: SoilLayer = soil_layer
+        self.player_add: Callable[[str], None] = player_add
+        self.scheduler: Scheduler = scheduler
+        self.radius: int = radius
+
+        self.ground: Surface = assets.image(os.getcwd() + '/graphics/world/ground.png')
+        self.water_frames: List[Surface] = import_folder(os.getcwd() + '/graphics/water')
+        # the collision border is never drawn, one surface does for all of it
+        self.border_surf: Surface = pygame.Surface((TILE_SIZE, TILE_SIZE))
+        size: int = CHUNK_SIZE * TILE_SIZE
+        self.size: Tuple[int, int] = (math.ceil(self.ground.get_width() / size), math.ceil(self.ground.get_height() / size))
+
+        # the objects of the map are sorted into chunks up front, the tiles of a chunk are read when it first loads
+        self.tmx_data: Any = tmx_data
+        self.chunks: Dict[ChunkKey, WorldChunk] = {}
+        self.read: Set[ChunkKey] = set()
+        self.index(tmx_data)
+        # sprites of the loaded chunks, and the trees among them by map position
+        self.loaded: Dict[ChunkKey, List[pygame.sprite.Sprite]] = {}
+        self.trees: Dict[Tuple[int, int], Tree] = {}
+        # trees of unloaded chunks by map position, and of the whole map once a save is loaded
+        self.saved_trees: Dict[Tuple[float, float], TreeState] = {}
+        self.centre: Optional[ChunkKey] = None
+
+    def chunk(self, x: int, y: int) -> WorldChunk:
+        '''the chunk of a tile, made when missing'''
+        key: ChunkKey = chunk_of(x, y)
+        if key not in self.chunks:
+            self.chunks[key] = WorldChunk()
+        return self.chunks[key]
+
+    def index(self, tmx_data: Any) -> None:
+        '''sorting the map's objects into chunks, in the order the level used to create them'''
+        for obj in tmx_data.get_layer_by_name('Trees'):
+            self.chunk(int(obj.x // TILE_SIZE), int(obj.y // TILE_SIZE)).trees.append(((obj.x, obj.y), obj.image, obj.name))
+        for obj in tmx_data.get_layer_by_name('Decoration'):
+            self.chunk(int(obj.x // TILE_SIZE), int(obj.y // TILE_SIZE)).flowers.append(((obj.x, obj.y), obj.image, obj.name))
+
+    def stream(self, pos: Tuple[float, float]) -> None:
+        '''loading the chunks within the radius of a world position and unloading the ones well past it'''
+        centre: ChunkKey = chunk_of(int(pos[0] // TILE_SIZE), int(pos[1] // TILE_SIZE))
+        if centre == self.centre:
+            return
+        self.centre = centre
+        for key in [key for key in self.loaded if max(abs(key[0] - centre[0]), abs(key[1] - centre[1])) > self.radius + 1]:
+            self.unload(key)
+        for y in range(max(0, centre[1] - self.radius), min(self.size[1], centre[1] + self.radius + 1)):
+            for x in range(max(0, centre[0] - self.radius), min(self.size[0], centre[0] + self.radius + 1)):
+                if (x, y) not in self.loaded:
+                    self.load((x, y))
+
+    def load_all(self) -> None:
+        '''loading every chunk, for tools that need the whole map'''
+        for y in range(self.size[1]):
+            for x in range(self.size[0]):
+                if (x, y) not in self.loaded:
+                    self.load((x, y))
+
+    def read_tiles(self, key: ChunkKey) -> WorldChunk:
+        '''the chunk with its tiles, read from the map's layers the first time, in the order the level used to
+        create them'''
+        chunk: WorldChunk = self.chunks.setdefault(key, WorldChunk())
+        if key in self.read:
+            return chunk
+        self.read.add(key)
+        for layer in ['HouseFloor', 'HouseFurnitureBottom']:
+            chunk.house_bottom += chunk_tiles(self.tmx_data, layer, key)
+        for layer in ['HouseWalls', 'HouseFurnitureTop']:
+            chunk.house_top += chunk_tiles(self.tmx_data, layer, key)
+        chunk.fence += chunk_tiles(self.tmx_data, 'Fence', key)
+        chunk.water += [(x, y) for x, y, _ in chunk_tiles(self.tmx_data, 'Water', key)]
+        chunk.collision += [(x, y) for x, y, _ in chunk_tiles(self.tmx_data, 'Collision', key)]
+        return chunk
+
+    def load(self, key: ChunkKey) -> None:
+        '''creating the sprites of a chunk'''
+        chunk: WorldChunk = self.read_tiles(key)
+        size: int = CHUNK_SIZE * TILE_SIZE
+        sprites: List[pygame.sprite.Sprite] = []
+
+        area: pygame.Rect = pygame.Rect(key[0] * size, key[1] * size, size, size).clip(self.ground.get_rect())
+        sprites.append(Chunk(area.topleft, self.ground.subsurface(area), self.all_sprites, LAYERS['ground']))
+        sprites += bake_tiles(chunk.house_bottom, self.all_sprites, LAYERS['house bottom'])
+        for x, y, surf in chunk.house_top:
+            sprites.append(Generic((x * TILE_SIZE, y * TILE_SIZE), surf, [self.all_sprites]))
+        for x, y, surf in chunk.fence:
+            sprites.append(Generic((x * TILE_SIZE, y * TILE_SIZE), surf, [self.all_sprites, self.collision_sprites]))
+        for water in bake_animated(chunk.water, self.water_frames, self.all_sprites, LAYERS['water'], Water.animation_speed):
+            self.sync_water(water)
+            sprites.append(water)
+        for pos, surf, name in chunk.trees:
+            tree: Tree = Tree(pos, surf, [self.all_sprites, self.collision_sprites, self.tree_sprites], name,
+                              self.player_add, self.scheduler)
+            if pos in self.saved_trees:
+                tree.restore(self.saved_trees.pop(pos))
+            self.trees[pos] = tree
+            sprites.append(tree)
+        for pos, surf, _ in chunk.flowers:
+            sprites.append(Wildflower(pos, surf, [self.all_sprites, self.collision_sprites]))
+        for x, y in chunk.collision:
+            sprites.append(Generic((x * TILE_SIZE, y * TILE_SIZE), self.border_surf, [self.collision_sprites]))
+
+        self.loaded[key] = sprites
+        self.soil_layer.load_chunk(key)
+
+    def sync_water(self, water: AnimatedChunk) -> None:
+        '''starting new water on the frame the loaded water is showing'''
+        for sprites in self.loaded.values():
+            for sprite in sprites:
+                if isinstance(sprite, AnimatedChunk):
+                    water.frame_index = sprite.frame_index
+                    water.image = water.frames[int(water.frame_index)]
+                    return
+
+    def unload(self, key: ChunkKey) -> None:
+        '''saving the trees and plants of a chunk and dropping its sprites'''
+        for pos, _, _ in self.chunks[key].trees if key in self.chunks else []:
+            tree: Tree = self.trees.pop(pos)
+            self.saved_trees[pos] = tree.save()
+            for apple in tree.apple_sprites.sprites():
+                apple.kill()
+        for sprite in self.loaded.pop(key):
+            sprite.kill()
+        self.soil_layer.unload_chunk(key)
+
+    def reset(self) -> None:
+        '''a new day: the apples of unloaded trees grow again when they are next loaded'''
+        for pos, (health, is_alive, _) in self.saved_trees.items():
+            self.saved_trees[pos] = (health, is_alive, None)